@@ -1,26 +1,177 @@
 import pandas
+import numpy
 import datetime
-import wordcloud
 import textwrap
 import os
 import webbrowser
 import re
 import multiprocessing
+import importlib.util
+
+from multiprocessing import shared_memory
 
-from matplotlib import pyplot as plt, ticker
 from collections import Counter
-from rtgo import ReadyThready
 
 from litspy.input_args import Arguments
 from litspy.logger import Logger
 from litspy.epmc_query import Query
-from litspy.create_html import HtmlResults
+from litspy.get_synonyms import OLSRequests
+from litspy.create_html import HtmlResults, remove_stars
 from litspy.noisy_phrases import stop_words, not_top_ten
 
 import warnings
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
 
+# words of at least two characters, used to count the words in abstracts
+token_regex = re.compile(r"\b\w{2,}\b")
+# match clone-based gene names (e.g. AC012345.6) or gene map locations (e.g. 7q31.2), which are not searched
+dirty_gene_regex = re.compile(r"(?:[A-Z]{2,}\d{6}\.\d|\d{1,2}[pq]\d+\.?\d*)")
+
+# columns of the details df created for each search, in the order they appear in the outputs
+result_columns = ("ID", "Title", "Year", "Author", "Publication type", "Abstract", "Keywords", "url")
+
+# read-only data for the worker processes, loaded once per worker by init_worker rather than sent with every task
+worker_data = {}
+
+
+def init_worker(date_stamp, abstracts_info, syn_key_dict, universal_syn_phrases, universal_syn_words, results_html,
+                charts):
+    """
+    initialise a worker process with the data shared by all of its word counting, chart and html page tasks
+
+    :param str date_stamp: date stamp of the start time, used in chart file names
+    :param tuple abstracts_info: name of the shared memory block of abstracts, list of byte offsets of each abstract in
+                                 the block, and dict of gene key and the (start, end) indexes of its offsets (or None
+                                 if words are not to be counted)
+    :param dict syn_key_dict: dict of gene key and all the syns specifically used in that query (genes and kwds)
+    :param list universal_syn_phrases: synonyms phrases used in all queries (e.g. multiword disease syns)
+    :param list universal_syn_words: synonym words used in all queries (e.g. single word disease syns)
+    :param HtmlResults results_html: initialised html results object
+    :param bool charts: whether or not to include charts in the html pages
+    :return: None
+    """
+    worker_data.update({'date_stamp': date_stamp, 'syn_key_dict': syn_key_dict,
+                        'universal_syn_phrases': universal_syn_phrases, 'universal_syn_words': universal_syn_words,
+                        'results_html': results_html, 'charts': charts})
+
+    if abstracts_info is None:
+        return
+
+    shm_name, offsets, gene_slices = abstracts_info
+
+    # read the abstracts from the block created by the parent process, rather than receiving a copy of the abstracts
+    worker_data.update({'abstracts_shm_name': shm_name, 'abstract_offsets': offsets, 'gene_slices': gene_slices})
+
+
+def get_pyplot():
+    """
+    import pyplot with the non-interactive backend. Imported on first use rather than at module level, so that
+    processes that don't create charts don't pay the import cost
+
+    :return: matplotlib pyplot module
+    :rtype: module
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # charts are only saved to files, so use the non-interactive backend
+    from matplotlib import pyplot as plt
+    return plt
+
+
+def get_chart_figure():
+    """
+    get this process's chart figure, cleared of any previous chart. The figure is created on first use and then
+    reused for each chart the process creates
+
+    :return: empty figure
+    :rtype: matplotlib.figure.Figure
+    """
+    if 'figure' not in worker_data:
+        worker_data['figure'] = get_pyplot().figure()
+    chart_fig = worker_data['figure']
+    chart_fig.clf()
+    return chart_fig
+
+
+def read_shared_abstracts(g_key):
+    """
+    read the abstracts for a gene key from the shared memory block of abstracts
+
+    :param str g_key: gene-based key
+    :return: series of the available abstracts for the gene key
+    :rtype: pandas.Series
+    """
+    offsets = worker_data['abstract_offsets']
+    start, end = worker_data['gene_slices'][g_key]
+
+    # attach to the block of abstracts only while copying the gene's abstracts from it, and release the view of the
+    # block and close it again even if reading fails
+    abstracts_shm = shared_memory.SharedMemory(name=worker_data['abstracts_shm_name'])
+    try:
+        with abstracts_shm.buf[offsets[start]:offsets[end]] as gene_buf:
+            gene_bytes = bytes(gene_buf)
+    finally:
+        abstracts_shm.close()
+
+    # split the gene's abstracts at their offsets, relative to the start of the gene's abstracts
+    base = offsets[start]
+    abstracts = [gene_bytes[offsets[i] - base:offsets[i + 1] - base].decode('utf-8') for i in range(start, end)]
+    return pandas.Series(abstracts, dtype=object)
+
+
+def get_counted_relevant_words(g_key):
+    """
+    return a count of relevant (not queried or stopword) words from the abstracts to be used to determine the top
+    ten and/or create the wordcloud. Runs in a worker process initialised by init_worker
+
+    :param str g_key: key for dicts
+    :return: tuple[gene key, Counter, filepath part]
+    """
+    cntr = Counter()
+    abstracts = read_shared_abstracts(g_key)
+    file_path_name_part = f"{worker_data['date_stamp']}/charts/{g_key.translate(remove_stars)}"
+
+    phrase_syns, single_syns = LitSpy.split_syn_phrases_and_singles(worker_data['syn_key_dict'][g_key])
+    all_phrase_syns = worker_data['universal_syn_phrases'] + phrase_syns
+    all_single_syns = worker_data['universal_syn_words'] + single_syns
+
+    # escape the syns so that regex characters are matched literally, and match longer syns first so that shorter
+    # overlapping syns do not leave fragments of the longer syns behind
+    or_syns = '|'.join(re.escape(syn) for syn in sorted(all_phrase_syns, key=len, reverse=True))
+
+    # compile the patterns once, rather than for every abstract
+    syns_regex = re.compile(or_syns, flags=re.IGNORECASE)
+    spaces_regex = re.compile(r"\s{2,}")
+
+    # clean all abstracts at once using the vectorised pandas string methods
+    abstracts = abstracts.str.replace("-", " ", regex=False)  # syns don't contain hyphenation, so remove hyphens
+    if all_phrase_syns:
+        abstracts = abstracts.str.replace(syns_regex, "", regex=True)  # remove all syn phrases from the text
+    abstracts = abstracts.str.replace(spaces_regex, " ", regex=True)  # remove multiple spaces following syn removal
+
+    noise = not_top_ten + stop_words
+    noise_set = set(noise)
+    single_syns_set = set(all_single_syns)
+
+    # alternations of the single-word syns and the noise, to find words containing any of them in one scan
+    contains_syn = re.compile('|'.join(re.escape(syn) for syn in single_syns_set)) if single_syns_set else None
+    contains_noise = re.compile('|'.join(re.escape(n) for n in noise_set))
+
+    # count the words of each abstract, removing the worst of the noise and numbers
+    # (compare lowercase words to the noise, but don't .lower() the counted words to maintain capitalisation)
+    for abstract in abstracts:
+        cntr.update(token for token in token_regex.findall(abstract)
+                    if token.lower() not in noise_set and not token.isdigit())
+
+    # remove case variants of noise and syns, and words containing both, whilst maintaining capitalisation
+    cntr = Counter({key: count for key, count in cntr.items()
+                    if not (key.upper() in single_syns_set or key.lower() in noise_set or
+                            (contains_syn and contains_syn.search(key.upper()) and
+                             contains_noise.search(key.lower())))})
+
+    return g_key, cntr, file_path_name_part
+
+
 def create_keyword_frequency_chart(name_result_tuple):
     """
     create a bar chart showing the frequency of publication year for the results in the supplied df
@@ -28,45 +179,48 @@ def create_keyword_frequency_chart(name_result_tuple):
     :param tuple name_result_tuple: tuple of gene key (str), keywords (list)
     :return: None (chart png file created)
     """
+    from matplotlib import ticker
+
     chart_name, kwd_list = name_result_tuple
-    kwd_fig = plt.figure()
+
+    # get the process's cleared figure and add new axes
+    kwd_fig = get_chart_figure()
+    ax = kwd_fig.add_subplot(111)
 
     if kwd_list:
         xlabel_list = []
 
-        # count keywords and find the 20 most common
-        raw_kwd_count = Counter(kwd_list)
-        top_20 = raw_kwd_count.most_common(20)
-        kwd_count = Counter(dict(top_20))
-
-        # get the axes to format the yticks labels
-        ax = kwd_fig.add_subplot(111)
+        # count keywords, partition out the (up to) 20 most common and sort them by descending frequency
+        kwds, counts = numpy.unique(numpy.asarray(kwd_list, dtype=object), return_counts=True)
+        top_idx = numpy.argpartition(-counts, min(20, len(counts)) - 1)[:20]
+        top_idx = top_idx[numpy.argsort(-counts[top_idx], kind='stable')]
+        labels, freqs = kwds[top_idx], counts[top_idx]
 
         # plot chart of keywords & their frequency
-        plt.bar(range(len(kwd_count)), kwd_count.values())
+        ax.bar(range(len(labels)), freqs)
 
         # wrap the top 20 keywords to max 21 characters per line
-        for label in kwd_count.keys():
+        for label in labels:
             wrapped_label = textwrap.wrap(label, width=21)
             x_label = "\n".join(wrapped_label)
             xlabel_list.append(x_label)
 
         # add the keywords and frequencies to the axes, and optimise formats
-        plt.xticks(range(len(kwd_count)), xlabel_list, rotation=90, ma='right', ha='center', va='top', size=8)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(xlabel_list, rotation=90, ma='right', ha='center', va='top', size=8)
         ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
 
     # add title and axes labels
-    plt.title("Top 20 keywords present in results")
-    plt.ylabel("Frequency")
-    plt.xlabel("Keyword")
+    ax.set_title("Top 20 keywords present in results")
+    ax.set_ylabel("Frequency")
+    ax.set_xlabel("Keyword")
 
     # reduce margins around bars and ensure that the bottom doesn't get cut off
-    plt.margins(x=0.01)
-    plt.tight_layout()
+    ax.margins(x=0.01)
+    kwd_fig.tight_layout()
 
-    # save and close
+    # save (the figure is kept open for reuse)
     kwd_fig.savefig(f"html_results/{chart_name}_top20_kwds.png")
-    plt.close()
 
     return
 
@@ -78,8 +232,13 @@ def create_wordcloud(name_result_tuple):
     :param tuple name_result_tuple: tuple of chart name with gene key (str), abstracts (list)
     :return: None (png file created)
     """
+    import wordcloud
+
     _, abstract_text, chart_name = name_result_tuple
-    plt.figure()
+
+    # get the process's cleared figure and add new axes
+    wc_fig = get_chart_figure()
+    ax = wc_fig.add_subplot(111)
 
     # turn the abstracts in to a long string, or assign the string "none" to the variable if no abstracts
     if abstract_text:
@@ -92,19 +251,29 @@ def create_wordcloud(name_result_tuple):
                                  relative_scaling=0.35,
                                  background_color="white").generate_from_frequencies(abstract_text)
         # create the wordcloud plot
-        plt.imshow(wc, interpolation="bilinear")
+        ax.imshow(wc, interpolation="bilinear")
 
     # remove axes
-    plt.axis("off")
+    ax.axis("off")
 
-    # ensure no edges are cut off, save and close
-    plt.tight_layout()
-    plt.savefig(f"html_results/{chart_name}_wordcloud.png")
-    plt.close()
+    # ensure no edges are cut off and save (the figure is kept open for reuse)
+    wc_fig.tight_layout()
+    wc_fig.savefig(f"html_results/{chart_name}_wordcloud.png")
 
     return
 
 
+def create_html_output_page(page_info):
+    """
+    create a html page for the results of the search. Runs in a worker process initialised by init_worker
+
+    :param tuple page_info: tuple of gene key (str), dataframe containing results, top ten words and counts (list)
+    :return: saves a html output page
+    """
+    g_key, df, top_ten = page_info
+    worker_data['results_html'].make_html_page_for_results(g_key, df, worker_data['charts'], top_ten)
+
+
 class LitSpy:
     def __init__(self):
         """
@@ -132,17 +301,13 @@ class LitSpy:
         :param dict msg_dict: dictionary of logging levels (str) and associated messages (list)
         :return: None
         """
-        # if logging level key has messages, log each message at the relevant level
-        if msg_dict['info']:
-            for msg in msg_dict['info']:
-                self.logger.info(msg)
-        if msg_dict['warning']:
-            for msg in msg_dict['warning']:
-                self.logger.warning(msg)
-        if msg_dict['error']:
-            # if there are error messages, log them all then exit
-            for msg in msg_dict['error']:
-                self.logger.error(msg)
+        # log each message at the relevant level (levels without messages may be missing from the dict)
+        for level in ('info', 'warning', 'error'):
+            for msg in msg_dict.get(level, ()):
+                getattr(self.logger, level)(msg)
+
+        # if there were error messages, exit now that they have all been logged
+        if msg_dict.get('error'):
             exit("Error in supplied arguments. See log for more details")
 
     # function for determining if doc type is review. potentially use later to help determine score
@@ -197,14 +362,10 @@ class LitSpy:
 
         # if there are any duplicated genes, then use the cumulative count of each gene name to create unique keys
         if my_df.duplicated('UniProtID').any():
-            unique_key_list = []
-            gb = my_df.groupby('UniProtID').cumcount()
-            for i, row in my_df.iterrows():
-                if gb[i] == 0:
-                    unique_key_list.append(row[0])
-                else:
-                    unique_key_list.append(f"{row[0]}_{gb[i]+1}")
-            my_df['UniqueKey'] = unique_key_list
+            # the first occurrence keeps the gene name, later occurrences are suffixed with their count (e.g. ABC_2)
+            cum_count = my_df.groupby('UniProtID').cumcount()
+            ids = my_df['UniProtID'].astype(str)
+            my_df['UniqueKey'] = ids.where(cum_count == 0, ids + "_" + (cum_count + 1).astype(str))
         else:
             # if there are no duplicates, then the gene names can be used as unique keys
             my_df['UniqueKey'] = my_df['UniProtID']
@@ -254,16 +415,15 @@ class LitSpy:
         self.logger.info("Processing submitted genes to remove clone-based gene names and gene map locations")
         df.drop_duplicates(inplace=True)  # remove duplicate rows
 
-        clone_name_df = df[df['UniProtID'].str.match(r"[A-Z]{2,}\d{6}\.\d")]
-        map_name_df = df[df['UniProtID'].str.match(r"\d{1,2}[pq]\d+\.?\d*")]
-        dirty_df = pandas.concat([clone_name_df, map_name_df])
+        # flag clone-based gene names and gene map locations in a single pass, and keep only the other rows
+        dirty_mask = df['UniProtID'].str.match(dirty_gene_regex)
+        removed = df.loc[dirty_mask, 'UniProtID'].tolist()
+        df = df.loc[~dirty_mask].copy()
 
-        df.drop(dirty_df.index, inplace=True)
+        self.logger.info(f"Done processing submitted genes. {len(removed)} removed.")
 
-        self.logger.info(f"Done processing submitted genes. {len(dirty_df)} removed.")
-
-        if not dirty_df.empty:
-            removed_genes = ', '.join(dirty_df['UniProtID'].tolist())
+        if removed:
+            removed_genes = ', '.join(removed)
             self.logger.warning(f"The supplied gene(s) '{removed_genes}' will not be searched, as they were identified "
                                 f"as clone-based genes or gene map locations")
 
@@ -286,16 +446,14 @@ class LitSpy:
         :rtype: list[dict]
         """
         for res_dict in results_dicts:
-            # collect list of all doc IDs
-            all_ids = [x['ID'] for x in res_dict['true_result_doc_info']]
-
-            # only keep docs that are not a preprint of an item that is within the list of IDs
-            res_dict['true_result_doc_info'] = [x for x in res_dict['true_result_doc_info'] if x['prep_of']
-                                                not in all_ids]
+            # collect set of all doc IDs
+            id_set = {x['ID'] for x in res_dict['true_result_doc_info']}
 
-            # remove the preprint_of information to reduce df size later on
-            for each in res_dict['true_result_doc_info']:
-                each.pop('prep_of')
+            # only keep docs that are not a preprint of an item that is within the set of IDs, and drop the
+            # preprint_of information to reduce df size later on
+            res_dict['true_result_doc_info'] = [{k: v for k, v in x.items() if k != 'prep_of'}
+                                                for x in res_dict['true_result_doc_info']
+                                                if x['prep_of'] not in id_set]
 
         return results_dicts
 
@@ -342,10 +500,13 @@ class LitSpy:
 
         # create dict of dfs of detailed results
         for each in results_dicts:
-            # create a df of the relevant info about the result results dict
-            result_df = pandas.DataFrame(each['true_result_doc_info'])
-            # remove rows where the ID is "none"
-            result_df = result_df[result_df.ID != "none"]
+            # collect the relevant info about the results, excluding rows where the ID is "none"
+            rows = [x for x in each['true_result_doc_info'] if x.get('ID') != "none"]
+            # create a df of the results with known columns, skipping row-dict inference if there are no results
+            if rows:
+                result_df = pandas.DataFrame.from_records(rows, columns=result_columns)
+            else:
+                result_df = pandas.DataFrame(columns=result_columns)
             # prevent skipping indexes of removed rows, and start indexing at 1
             result_df.index = range(len(result_df.index))
             result_df.index += 1
@@ -365,7 +526,13 @@ class LitSpy:
         :rtype: None
         """
         self.logger.info(f"Printing results to output file '{self.args.outfile}'")
-        with pandas.ExcelWriter(self.args.outfile) as writer:
+
+        # write with xlsxwriter if it is installed, as it is faster and lighter on memory than the default (openpyxl).
+        # note: its constant_memory option is not used, as pandas writes sheets column by column rather than row by
+        # row, and constant_memory mode drops cells written to rows that have already been flushed
+        engine = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else None
+
+        with pandas.ExcelWriter(self.args.outfile, engine=engine) as writer:
             summary_df.to_excel(writer, sheet_name="summary", index=False)
             for k, v in details_dfs.items():
                 if not v.empty:
@@ -373,32 +540,38 @@ class LitSpy:
         self.logger.info(f"Done: successfully created output file {self.args.outfile}")
 
     @staticmethod
-    def create_year_frequency_chart(chart_name, year_counts):
+    def create_year_frequency_chart(chart_name, year_counts, year_fig):
         """
         create a bar chart showing the frequency of publication year for the results in the supplied df
 
         :param chart_name: string containing date stamp and gene key for output file creation
         :param year_counts: counter objects for number of docs/year
+        :param matplotlib.figure.Figure year_fig: figure to be cleared and reused for the chart
         :return: save a png file of the chart
         :rtype: None (png file created)
         """
+        from matplotlib import ticker
+
+        # clear the figure of any previous chart and add new axes
+        year_fig.clf()
+        ax = year_fig.add_subplot(111)
+
         if year_counts.empty:
-            plt.title("Number of publications per year")
+            ax.set_title("Number of publications per year")
         else:
             # plot the years and their frequencies with relevant title
-            ax = year_counts.plot.bar(title="Number of publications per year")
+            year_counts.plot.bar(title="Number of publications per year", ax=ax)
 
             # ensure the y axis uses integer ticks
             ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
 
         # add axes labels
-        plt.ylabel("Number of publications")
-        plt.xlabel("Year")
+        ax.set_ylabel("Number of publications")
+        ax.set_xlabel("Year")
 
-        # ensure no edges are cut off, save and close
-        plt.tight_layout()
-        plt.savefig(f"html_results/{chart_name}_by_year.png")
-        plt.close()
+        # ensure no edges are cut off and save
+        year_fig.tight_layout()
+        year_fig.savefig(f"html_results/{chart_name}_by_year.png")
 
     @staticmethod
     def split_syn_phrases_and_singles(syns):
@@ -420,82 +593,35 @@ class LitSpy:
 
         return syn_phrases, single_syns
 
-    def get_counted_relevant_words(self, g_key, dfs_dict, syn_key_dict, universal_syn_phrases, universal_syn_words):
-        """
-        return a count of relevant (not queried or stopword) words from the abstracts to be used to determine the top
-        ten and/or create the wordcloud
-
-        :param str g_key: key for dicts
-        :param dict dfs_dict: dict of dataframes containing results for each gene queried
-        :param syn_key_dict: dict of gene key and all the syns specifically used in that query (genes and kwds)
-        :param universal_syn_phrases: synonyms phrases used in all queries (e.g. multiword disease syns)
-        :param universal_syn_words: synonym words used in all queries (e.g. single word disease syns)
-        :return: tuple[gene key, Counter, filepath part]
-        """
-        cntr = Counter()
-        df = dfs_dict[g_key]
-        abs_list = df['Abstract'].tolist()
-        cleaned_abstracts = []
-        file_path_name_part = f"{self.date_stamp}/charts/{g_key.replace('*', '')}"
-
-        phrase_syns, single_syns = self.split_syn_phrases_and_singles(syn_key_dict[g_key])
-        all_phrase_syns = universal_syn_phrases + phrase_syns
-        all_single_syns = universal_syn_words + single_syns
-        or_syns = '|'.join(all_phrase_syns)
-
-        for a in abs_list:
-            if not a == "unavailable":
-                a.replace("-", " ")  # syns don't contain hyphenation, so remove hyphens for better matching
-                a = re.sub(or_syns, "", a, flags=re.IGNORECASE)  # remove all syn phrases from the text
-                a = re.sub(r"\s{2,}", " ", a)  # remove multiple spaces following syn removal
-                cleaned_abstracts.append(a)
-
-        text = " ".join(cleaned_abstracts)
-
-        # if a string of abstracts exists, then turn it in to a counter (excluding stopwords and other noise)
-        if text:
-            keys_to_exclude = []
-            noise = not_top_ten + stop_words
-
-            # remove the worst of the noise
-            # (stopword removal only works for lowercase words, but don't .lower() to maintain important capitalisation)
-            counts = wordcloud.WordCloud(stopwords=set(noise)).process_text(text)
-
-            # remove case variants of noise whilst maintaining capitalisation of counted words
-            for key in counts.keys():
-                if key.upper() in all_single_syns:
-                    keys_to_exclude.append(key)
-                elif key.lower() in noise:
-                    keys_to_exclude.append(key)
-                elif any(s in key.upper() for s in all_single_syns) and any(n in key.lower() for n in noise):
-                    keys_to_exclude.append(key)
-
-            for each in keys_to_exclude:
-                counts.pop(each)
-
-            cntr.update(counts)
-
-        return g_key, cntr, file_path_name_part
-
-    def create_html_output_page(self, g_key, counts, dfs, results_html):
+    @staticmethod
+    def create_shared_abstracts(details_dfs):
         """
-        create a html page for the results of the search
+        copy the available abstracts of all results in to a single block of shared memory, to be read by the worker
+        processes
 
-        :param str g_key: gene-based key
-        :param dict counts: dictionary of gene key: count of each relevant word in the abstracts
-        :param dict dfs: dictionary of gene key: dataframe containing results
-        :param HTMLResults results_html: initialised html results object
-        :return: saves a html output page
+        :param dict details_dfs: dict of dataframes containing results for each gene queried
+        :return: shared memory block of abstracts, list of byte offsets of each abstract in the block, and dict of gene
+                 key and the (start, end) indexes of its abstracts' offsets
+        :rtype: tuple[multiprocessing.shared_memory.SharedMemory, list, dict]
         """
-        top_ten = []
-        df = dfs[g_key]
+        encoded_abstracts = []
+        offsets = [0]
+        gene_slices = {}
+
+        for g_key, df in details_dfs.items():
+            start = len(encoded_abstracts)
+            for abstract in df['Abstract']:
+                if not abstract == "unavailable":
+                    encoded = str(abstract).encode('utf-8')
+                    encoded_abstracts.append(encoded)
+                    offsets.append(offsets[-1] + len(encoded))
+            gene_slices[g_key] = (start, len(encoded_abstracts))
 
-        if counts:
-            count = counts[g_key]
-            if count:
-                top_ten = count.most_common(10)
+        # shared memory blocks can't be empty, so allocate at least one byte
+        abstracts_shm = shared_memory.SharedMemory(create=True, size=max(offsets[-1], 1))
+        abstracts_shm.buf[:offsets[-1]] = b"".join(encoded_abstracts)
 
-        results_html.make_html_page_for_results(g_key, df, self.args.charts, top_ten)
+        return abstracts_shm, offsets, gene_slices
 
     def make_outputs_and_get_location(self, summary_df, details_dfs, summary_dict, kwd_and_gene_dict, tissue_syns,
                                       disease_syns, other_syns):
@@ -511,12 +637,14 @@ class LitSpy:
         :param other_syns: list of other command line-derived synonyms queried
         :return: path to created results summary output file
         """
-        ReadyThready.set_logger(self.logger)
         syns_queried = tissue_syns + disease_syns + other_syns
         warning_required = False
         abs_counts = []
         abs_count_dict = {}
         kwds = []
+        abstracts_shm = None
+        abstracts_info = None
+        universal_syn_phrases, universal_syn_words = [], []
 
         # create the excel output file if requested
         if self.args.outfile:
@@ -526,43 +654,74 @@ class LitSpy:
         self.logger.info("Creating HTML results files")
         results_html = HtmlResults(summary_dict, self.date_stamp)
 
-        # get counts of words in abstracts (except stopwords and queried terms)
         if self.args.charts or self.args.top_ten:
             universal_syn_phrases, universal_syn_words = self.split_syn_phrases_and_singles(syns_queried)
-            abs_counts = ReadyThready.go(func=self.get_counted_relevant_words, arg_data_index=0,
-                                         n_threads=self.args.n_threads,
-                                         args=[list(details_dfs.keys()), details_dfs, kwd_and_gene_dict,
-                                               universal_syn_phrases, universal_syn_words])
-            if self.args.top_ten:
-                abs_count_dict = {g_key: abs_count for g_key, abs_count, _ in abs_counts}
-
-        if self.args.charts:
-            for k, v in details_dfs.items():
-                # get list of tuples of file name part and lowercase article keywords
-                name = f"{self.date_stamp}/charts/{k.replace('*', '')}"
-                kwds.append((name, [item.lower() for each in v['Keywords'].tolist() for item in each]))
-                # workaround: create year charts here to prevent windows permission issues in multiprocess
-                year_counts = v.Year.value_counts()
-                self.create_year_frequency_chart(name, year_counts.sort_index(ascending=True))
-
-            # create charts via multiprocess
-            pool = multiprocessing.Pool()
-            # try to create the charts using multiprocess, or warn and continue if any charts are not created
-            try:
-                pool.map(create_keyword_frequency_chart, kwds)
-                pool.map(create_wordcloud, abs_counts)
-            except RecursionError as e:
-                # windows access errors can occur, possibly https://bugs.python.org/issue38188
-                warning_required = e
-            pool.close()
-            pool.join()
-            if warning_required:
-                self.logger.warning(f"Unable to create some output charts. All other output information is "
-                                    f"unaffected. Error information: {warning_required}")
+            # put the abstracts in shared memory once, rather than sending a copy of them to each process
+            abstracts_shm, offsets, gene_slices = self.create_shared_abstracts(details_dfs)
+            abstracts_info = (abstracts_shm.name, offsets, gene_slices)
 
-        ReadyThready.go(func=self.create_html_output_page,
-                        args=[list(details_dfs.keys()), abs_count_dict, details_dfs, results_html],
-                        arg_data_index=0, n_threads=self.args.n_threads)
+        pool = None
+        try:
+            # word counting, charts and html pages are cpu-bound, so use a pool of processes, with the data they need
+            # loaded once per process so that only the gene-specific data is sent for each task
+            pool = multiprocessing.Pool(processes=self.args.n_threads or None, initializer=init_worker,
+                                        initargs=(self.date_stamp, abstracts_info, kwd_and_gene_dict,
+                                                  universal_syn_phrases, universal_syn_words, results_html,
+                                                  self.args.charts))
+
+            # get counts of words in abstracts (except stopwords and queried terms)
+            if abstracts_shm:
+                abs_counts = pool.map(get_counted_relevant_words, list(details_dfs.keys()))
+                if self.args.top_ten:
+                    abs_count_dict = {g_key: abs_count for g_key, abs_count, _ in abs_counts}
+
+            if self.args.charts:
+                # create the year charts on one figure, cleared and reused for each chart
+                plt = get_pyplot()
+                year_fig = plt.figure()
+                for k, v in details_dfs.items():
+                    # get list of tuples of file name part and lowercase article keywords
+                    name = f"{self.date_stamp}/charts/{k.translate(remove_stars)}"
+                    # (rows without a keyword list are treated as having no keywords)
+                    article_kwds = v['Keywords'].map(lambda x: x if isinstance(x, list) else [])
+                    kwds.append((name, article_kwds.explode().dropna().str.lower().tolist()))
+                    # workaround: create year charts here to prevent windows permission issues in multiprocess
+                    self.create_year_frequency_chart(name, v['Year'].value_counts().sort_index(), year_fig)
+                plt.close(year_fig)
+
+                # try to create the charts using multiprocess, or warn and continue if any charts are not created
+                try:
+                    pool.map(create_keyword_frequency_chart, kwds)
+                    pool.map(create_wordcloud, abs_counts)
+                except RecursionError as e:
+                    # windows access errors can occur, possibly https://bugs.python.org/issue38188
+                    warning_required = e
+                if warning_required:
+                    self.logger.warning(f"Unable to create some output charts. All other output information is "
+                                        f"unaffected. Error information: {warning_required}")
+
+            # create the results html pages, with the top ten words for each if they were counted
+            pages = [(g_key, df, abs_count_dict[g_key].most_common(10) if abs_count_dict.get(g_key) else [])
+                     for g_key, df in details_dfs.items()]
+            # the time to create a page grows with its number of results, so hand out the largest pages first and one at
+            # a time, so that the processes finish at around the same time rather than one being left with a large batch
+            pages.sort(key=lambda page: len(page[1]), reverse=True)
+            pool.map(create_html_output_page, pages, chunksize=1)
+
+            pool.close()
+        except BaseException:
+            # if the pool work fails, stop the processes straight away rather than leaving them running the remaining
+            # tasks
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.join()
+            # release the shared memory block of abstracts, whether or not the pool work succeeded
+            if abstracts_shm:
+                abstracts_shm.close()
+                abstracts_shm.unlink()
 
         # create the summary html page
         results_html.make_html_page_for_summary(summary_df)
@@ -579,6 +738,10 @@ class LitSpy:
         # create output directories
         self.create_html_output_directories()
 
+        # turn off the cache of EBI OLS responses on disk, if requested, so that all synonyms are requested again
+        if self.args.no_cache:
+            OLSRequests.disk_cache.enabled = False
+
         # convert input data to a data frame
         df = self.get_input_data_as_data_frame()
 
@@ -25,6 +25,17 @@ greek_dict = {"alpha": ["α", "𝛂", "𝛼"],
               "psi": ["ψ", "𝛹"],
               "omega": ["Ω", "ѡ"]}
 
+# every greek character variant in the dictionary above, flattened once
+greek_char_variants = tuple(char for char_list in greek_dict.values() for char in char_list)
+
 numerals = ["I", "X", "V"]
 
 hyphens = ["-", "–", "—", "‑"]
+
+# the numerals and hyphens joined once for use in regexes, as the contents of a character class or as alternatives
+numeral_chars = ''.join(numerals)
+hyphen_chars = ''.join(hyphens)
+hyphen_alternatives = '|'.join(hyphens)
+
+# translation table to normalise all hyphen variants to spaces in a single pass over a string
+hyphen_table = str.maketrans(dict.fromkeys(hyphens, " "))
@@ -1,21 +1,62 @@
 import requests
 import re
+import copy
 import itertools
 import threading
 import multiprocessing
-import copy
+import functools
+import heapq
+import math
+import urllib3
 
 from collections import Counter
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
 from rtgo import ReadyThready
-from urllib import parse
 
+from litspy.http_session import HttpSession
 from litspy.get_synonyms import ExtractOLSSynonyms, OLSRequests, GetUniprotSynonyms, ArgumentCleaner
-from litspy.alternative_characters import hyphens, greek_dict, numerals
+from litspy.alternative_characters import numeral_chars, hyphen_chars, hyphen_alternatives
 from litspy.noisy_phrases import common_gene_noise, stop_words
 
+# regexes used for every gene synonym, compiled once rather than on each call
+# gene synonyms that end in a number (or a number and letter), from which a root phrase can be taken
+gene_root_regex = re.compile(fr".+?[{hyphen_chars}\s,]*(\d| [{numeral_chars}]+)+[A-z]?(\d| [{numeral_chars}]+)*$")
+# captures the root phrase of a gene synonym as group 1
+gene_root_capture_regex = re.compile(
+    fr"(.+?)(TYPE|[Tt]ype)?[{hyphen_chars}\s,]*(\d| [{numeral_chars}]+)+([{hyphen_chars}\s,]|[A-z]|MOTIF|[Mm]otif|PROTEIN|[Pp]rotein|DOMAIN|[Dd]omain|PSEUDOGENE|[Pp]seudogene|CONTAINING|[Cc]ontaining)*(\d| [{numeral_chars}]+)*$")
+# ORF, UNQ and KIAA type names, which are not gene families
+orf_regex = re.compile(r"[Cc]\d+orf\d+")
+unq_regex = re.compile(r"UNQ\d+/PRO\d+")
+kiaa_regex = re.compile(r"KIAA\d+")
+# gene names that end with numbers (and optionally a letter), suggesting a systematically named family
+gene_family_regex = re.compile(r".*\d+[A-z]?\d*$", re.IGNORECASE)
+# common noise synonyms: abbreviations or single letters followed by numbers
+numbered_noise_regex = re.compile(r"([A-z]|CI|CD|CT|CRP|PP|LAG|PER|period|TC|UP) \d+\s?\d*", re.IGNORECASE)
+v_l_noise_regex = re.compile(r"[vVlL]\d+\s?\d*")
+# splits synonyms in to words on hyphens and spaces
+hyphen_space_split_regex = re.compile(f"{hyphen_alternatives}| ")
+
+# bytes that parse.quote_plus leaves as a single character (spaces become '+'); every other byte becomes '%xx'
+quote_plus_single_chars = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~ "
+
+# tags of the parts of Europe PMC xml results pages that are parsed as the page is downloaded, and the parent tag
+# each is expected in
+results_page_parent_tags = {'hitCount': 'responseWrapper', 'nextCursorMark': 'responseWrapper',
+                            'queryString': 'request', 'result': 'resultList'}
+# tags of the fields of a Europe PMC result, of which the first tag with each name within the result is used
+result_field_tags = ('id', 'source', 'title', 'pubYear', 'authorString', 'abstractText', 'pubType')
+
+# sets of noise words, for fast membership tests
+common_gene_noise_set = frozenset(common_gene_noise)
+stop_words_set = frozenset(stop_words)
+
 
 class Query:
+    # session shared by all instances and threads, so that connections to Europe PMC are kept alive and reused rather
+    # than opened for every query
+    session = HttpSession.create_session()
+
     def __init__(self, df, logger, disease=None, tissue=None, kwds=None, others=None, expand=None,
                  n_threads=multiprocessing.cpu_count(), min_syn_len=None):
         """
@@ -39,17 +80,51 @@ class Query:
         self.other_args = others
         self.expand = expand
         self.n_threads = n_threads
-        self.greek_chars = []
-        for chr_list in greek_dict.values():
-            self.greek_chars.extend(chr_list)
         self.disease_syns = []
         self.tissue_syns = []
         self.kwd_syns = []
         self.kwd_syn_lists = []
-        self.gene_syns = []
-        self.gene_syn_roots = []
+        # lists of keyword synonyms for each keyword string, so that rows with the same keywords reuse them
+        self.kwd_syn_lists_by_string = {}
+        # roots and parts of family synonyms for each set of gene synonyms, so that rows with the same gene reuse them
+        self.roots_and_parts_by_syns = {}
+        # field queries and encoded lengths for each list of synonyms split between queries, so that a list that is
+        # split for every row (e.g. long disease synonym lists) is only processed once
+        self.fields_and_lengths_by_syns = {}
         self.min_syn_len = min_syn_len
 
+    @staticmethod
+    def add_abstract_title_fields(syn, search_in_kwds=True):
+        """
+        add parameters for EPMC search in abstract and title regions (and keywords) to a synonym
+
+        :param str syn: synonym
+        :param bool search_in_kwds: whether to search in the keywords list for the term
+                                    (false for gene roots, otherwise True)
+        :return: e.g. TITLE_ABS:"synonym" OR KW:"synonym"
+        :rtype: str
+        """
+        """
+        deprecated code from before the introduction of the combined title & abstract field
+
+        # if the synonym already has the fields added (possible for keyword synonyms), add it to the list
+        if syn.startswith("(TITLE:"):
+            exp_syns.append(syn.strip("()"))  # remove brackets to avoid extra brackets getting added later
+        # else, create the field query and add it to the list
+        elif search_in_kwds:
+            exp_syns.append(f'TITLE:"{syn}" OR KW:"{syn}" OR ABSTRACT:"{syn}"')
+        else:
+            exp_syns.append(f'TITLE:"{syn}" OR ABSTRACT:"{syn}"')
+        """
+        # if the synonym already has the fields added (possible for keyword synonyms), return it
+        if syn.startswith("(TITLE_ABS:"):
+            return syn.strip("()")  # remove brackets to avoid extra brackets getting added later
+        # else, create the field query
+        elif search_in_kwds:
+            return f'TITLE_ABS:"{syn}" OR KW:"{syn}"'
+        else:
+            return f'TITLE_ABS:"{syn}"'
+
     @staticmethod
     def add_abstract_title_and_join_synonyms(syns, search_in_kwds=True, join_on_and=False):
         """
@@ -61,33 +136,9 @@ class Query:
         :param bool join_on_and: whether to join terms on AND (default false, to join on OR)
         :return: string of joined synonyms with relevant title and abstract parameters
         """
-        # initialise
-        exp_syns = []
-
-        # create e.g. ABSTRACT:"synonym" OR TITLE:"synonym" for every synonym, and add to a list
-        for syn in syns:
-            """
-            deprecated code from before the introduction of the combined title & abstract field
-            
-            # if the synonym already has the fields added (possible for keyword synonyms), add it to the list
-            if syn.startswith("(TITLE:"):
-                exp_syns.append(syn.strip("()"))  # remove brackets to avoid extra brackets getting added later
-            # else, create the field query and add it to the list
-            elif search_in_kwds:
-                exp_syns.append(f'TITLE:"{syn}" OR KW:"{syn}" OR ABSTRACT:"{syn}"')
-            else:
-                exp_syns.append(f'TITLE:"{syn}" OR ABSTRACT:"{syn}"')
-            """
-            # if the synonym already has the fields added (possible for keyword synonyms), add it to the list
-            if syn.startswith("(TITLE_ABS:"):
-                exp_syns.append(syn.strip("()"))  # remove brackets to avoid extra brackets getting added later
-            # else, create the field query and add it to the list
-            elif search_in_kwds:
-                exp_syns.append(f'TITLE_ABS:"{syn}" OR KW:"{syn}"')
-            else:
-                exp_syns.append(f'TITLE_ABS:"{syn}"')
-
-        # join the items in the list to create e.g. (ABSTRACT:"1" OR TITLE:"1" OR ABSTRACT:"2" OR TITLE:"2")
+        # create e.g. TITLE_ABS:"synonym" OR KW:"synonym" for every synonym, and join them in a single pass to create
+        # e.g. (TITLE_ABS:"1" OR KW:"1" OR TITLE_ABS:"2" OR KW:"2")
+        exp_syns = (Query.add_abstract_title_fields(syn, search_in_kwds) for syn in syns)
         if join_on_and:
             query_string = '(' + ") & (".join(exp_syns) + ')'
         else:
@@ -125,18 +176,24 @@ class Query:
 
         self.logger.info(f"{threading.current_thread().name}: Collecting synonyms for '{term}'")
 
-        # for each iri, retrieve the information from the page as a dict and extract synonyms from it
+        # de-duplicate the iris (e.g. the same gene node found for several gene synonyms), keeping their order, so each
+        # page is only fetched and parsed once
+        iris = list(dict.fromkeys(iris))
+
+        # for each iri, retrieve the information from the page as a dict and extract synonyms from it. Each thread of
+        # the shared pool of OLS threads fetches and parses an iri in one pass, rather than waiting for every page to be
+        # fetched before any are parsed, and takes the next iri as soon as it is free. The iri's pages are then fetched
+        # in the same thread, rather than in another pool for every iri
         if len(iris) > 1:
-            parsed_json = ReadyThready.go(req.get_json_for_iri, [iris], 0, n_threads=self.n_threads)
-            syn_results = ReadyThready.go(synonyms.get_syns, [parsed_json, is_tissue], 0, n_threads=self.n_threads)
+            # wait for the synonyms of every iri to be collected in the synonyms object
+            list(req.run_in_pool(synonyms.get_syns_for_iri, iris, req, is_tissue))
 
-            # add collected syns to the syn list
-            for syn_list in syn_results:
-                syns.extend(syn_list)
+            # add the syns collected from all of the iris to the syn list at once, rather than every thread's copy of
+            # the syns collected so far
+            syns.extend(synonyms.syns)
         else:
             for iri in iris:
-                parsed_json = req.get_json_for_iri(iri)
-                syns.extend(synonyms.get_syns(parsed_json, is_tissue))
+                syns.extend(synonyms.get_syns_for_iri(iri, req, is_tissue))
 
         if is_tissue:
             # check the anatomy qualifiers dictionary for further synonyms and add them to the synonyms list
@@ -200,21 +257,39 @@ class Query:
 
         self.tissue_syns = syns
 
+    @staticmethod
+    def split_kwds(kwd_string):
+        """
+        split a comma-separated string of keywords in to a list of keywords, with surrounding whitespace removed
+
+        :param str kwd_string: comma-separated list of keywords
+        :return: list of keywords
+        :rtype: list[str]
+        """
+        return [kwd.strip() for kwd in kwd_string.split(',')]
+
     def get_kwd_synonyms(self, kwd_string):
         """
-        collect synonyms for a keyword
+        collect synonyms for a keyword. The synonyms for each keyword string are only collected once
 
         :param str kwd_string: comma-separated list of keywords (can be a phrases rather than a single words)
-        :return: list of lists of synonyms for the keyword
+        :return: list of the keywords for the output files, and list of lists of synonyms for each unique keyword
+        :rtype: tuple[list, list]
         """
+        # split the keywords once, for both the output and the synonyms
+        kwds = self.split_kwds(kwd_string)
+
+        # reuse the synonyms if these keywords have already been expanded (e.g. for another row)
+        if kwd_string in self.kwd_syn_lists_by_string:
+            return kwds, self.kwd_syn_lists_by_string[kwd_string]
+
         kwd_syns = []
-        raw_kwds = kwd_string.split(',')
-        kwds = [x.strip() for x in raw_kwds]
-        kwds = list(set(kwds))
+        # de-duplicate the keywords in a single pass, keeping their order and leaving out empty keywords
+        unique_kwds = list(dict.fromkeys(kwd for kwd in kwds if kwd))
 
         # get synonyms for the keywords if specified, add keywords and their synonyms to the list of kwd syns
         if self.expand:
-            for kwd in kwds:
+            for kwd in unique_kwds:
                 # initialise requests object with the keyword
                 arg_requests = OLSRequests(kwd, self.logger)
 
@@ -234,12 +309,12 @@ class Query:
                     kwd_syns.append(syns)
 
         else:
-            for kwd in kwds:
+            for kwd in unique_kwds:
                 kwd_syns.append([kwd])
 
-        self.kwd_syn_lists = kwd_syns
+        self.kwd_syn_lists_by_string[kwd_string] = kwd_syns
 
-        return
+        return kwds, kwd_syns
 
     def get_constant_query_strings(self):
         """
@@ -271,27 +346,36 @@ class Query:
                                   f"following in order to allow the query to run with settings: {others_query_string}")
                 others_query_string = ""
 
-        # if a tissue was supplied, perform synonym expansion and return a string for querying
+        # collect the synonyms of the supplied tissue, disease and keywords from OLS at the same time, as each search is
+        # independent of the others (result() re-raises any errors from the threads)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            syn_jobs = []
+            kwd_job = None
+            if self.tissue:
+                syn_jobs.append(executor.submit(self.get_tissue_syns))
+            if self.disease:
+                syn_jobs.append(executor.submit(self.get_disease_syns))
+            if self.kwds:
+                kwd_job = executor.submit(self.get_kwd_synonyms, self.kwds)
+            for syn_job in syn_jobs:
+                syn_job.result()
+            if kwd_job:
+                # store lists of keywords for each keyword
+                kwds, self.kwd_syn_lists = kwd_job.result()
+
+        # if a tissue was supplied, return a string of its synonyms for querying
         if self.tissue:
-            self.get_tissue_syns()
             tissue_query_string = self.add_abstract_title_and_join_synonyms(self.tissue_syns)
 
-        # if a disease was supplied, perform synonym expansion and return a string for querying
+        # if a disease was supplied, return a string of its synonyms for querying
         if self.disease:
-            self.get_disease_syns()
             disease_query_string = self.add_abstract_title_and_join_synonyms(self.disease_syns)
 
         if self.kwds:
-            # store lists of keywords for each keyword
-            self.get_kwd_synonyms(self.kwds)
-
-            for each in self.kwd_syn_lists:
-                # create a single list combining all keyword syns
-                self.kwd_syns.extend(each)
-                # construct the query string for the syns of the keyword
-                kwd_query_strings.append(self.add_abstract_title_and_join_synonyms(each))
-            raw_kwds = self.kwds.split(',')
-            kwds = [x.strip() for x in raw_kwds]
+            # create a single list combining all keyword syns
+            self.kwd_syns.extend(itertools.chain.from_iterable(self.kwd_syn_lists))
+            # construct the query string for the syns of each keyword
+            kwd_query_strings = [self.add_abstract_title_and_join_synonyms(each) for each in self.kwd_syn_lists]
 
         return disease_query_string, tissue_query_string, others_query_string, kwd_query_strings, kwds
 
@@ -300,29 +384,27 @@ class Query:
         get synonyms for the keywords (if specified) and make query strings from the keywords
 
         :param list[str] row: row from a df of query inputs represented as a list
-        :return: query parts for the keywords, and a list of keywords for the output file
-        :rtype: tuple[list, list, list]
+        :return: query parts for the keywords, a list of keywords for the output file, a list of all of the keyword
+                 synonyms, and the list of synonyms for each keyword
+        :rtype: tuple[list, list, list, list]
         """
         kwds = []
         kwd_query_strings = []
         kwd_flatlist = []
+        kwd_syn_lists = []
 
         # split keywords in to a list
         if row[4]:
             self.logger.info(f"{threading.current_thread().name}: Creating query parts for keyword(s) '{row[4]}'")
-            raw_kwds = row[4].split(',')
-            kwds = [x.strip() for x in raw_kwds]
-            self.get_kwd_synonyms(row[4])
-            for each_list in self.kwd_syn_lists:
-                kwd_query_string = self.add_abstract_title_and_join_synonyms(each_list)
-                kwd_query_strings.append(kwd_query_string)
+            kwds, kwd_syn_lists = self.get_kwd_synonyms(row[4])
+            kwd_query_strings = [self.add_abstract_title_and_join_synonyms(each_list) for each_list in kwd_syn_lists]
 
             self.logger.info(f"{threading.current_thread().name}: Done: successfully created query parts for the "
                              f"keyword(s) '{row[4]}'")
 
-            kwd_flatlist = [item for sublist in self.kwd_syn_lists for item in sublist]
+            kwd_flatlist = list(itertools.chain.from_iterable(kwd_syn_lists))
 
-        return kwd_query_strings, kwds, kwd_flatlist
+        return kwd_query_strings, kwds, kwd_flatlist, kwd_syn_lists
 
     def get_search_terms_string(self, kwds):
         """
@@ -365,8 +447,9 @@ class Query:
         :param list all_syns: list of synonyms
         :return: list: cleaned synonym list
         """
-        # initialise
-        filtered_syns = []
+        # initialise the de-duplicated synonyms (dict keys, to keep their order) with the original term, so that it is
+        # still in the list following cleaning
+        filtered_syns = {gene: None}
         cleaner = ExtractOLSSynonyms(gene, self.logger, self.min_syn_len)
 
         # perform the normal synonym cleaning
@@ -374,21 +457,16 @@ class Query:
 
         for syn in first_clean:
             # filter common noise and two-character synonyms
-            if len(syn) > 2 and not \
-                    re.fullmatch(r"([A-z]|CI|CD|CT|CRP|PP|LAG|PER|period|TC|UP) \d+\s?\d*", syn, re.IGNORECASE) \
-                    and not re.fullmatch(r"[vVlL]\d+\s?\d*", syn) and syn.upper() not in common_gene_noise:
+            if len(syn) > 2 and not numbered_noise_regex.fullmatch(syn) and not v_l_noise_regex.fullmatch(syn) \
+                    and syn.upper() not in common_gene_noise_set:
                 # filter phrases that start or end with stop words
-                split_syn = re.split(f"{'|'.join(hyphens)}| ", syn.lower())
+                split_syn = hyphen_space_split_regex.split(syn.lower())
                 last_part = split_syn[-1]
                 first_part = split_syn[0]
-                if last_part not in stop_words and first_part not in stop_words:
-                    filtered_syns.append(syn)
-
-        # ensure the original term is still in the list following cleaning
-        filtered_syns.insert(0, gene)
-        final_syns = list(set(filtered_syns))
+                if last_part not in stop_words_set and first_part not in stop_words_set:
+                    filtered_syns[syn] = None
 
-        return final_syns
+        return list(filtered_syns)
 
     def get_recurrent_root_phrases(self, syns):
         """
@@ -397,22 +475,13 @@ class Query:
         :param list syns: list of synonyms for a wildcard gene
         :return: list of root phrases from supplied synonyms
         """
-        # de-duplicate
-        syns = list(set(syns))
-        root_phrases = []
-        recurrent_root_phrases = []
-        for syn in syns:
-            root_phrase = self.get_root_name_from_gene_syn(syn)
-            if root_phrase:
-                root_phrases.append(root_phrase)
-        # count occurrences of number-stripped phrases, and if any are present more than once then return them
-        root_counts = Counter(root_phrases)
-        for k, v in root_counts.items():
-            if v > 1:
-                recurrent_root_phrases.append(k)
-        return recurrent_root_phrases
+        # count occurrences of the number-stripped root phrases of the de-duplicated syns (ignoring syns without a root),
+        # and if any are present more than once then return them
+        root_counts = Counter(filter(None, map(self.get_root_name_from_gene_syn, set(syns))))
+        return [k for k, v in root_counts.items() if v > 1]
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def get_root_name_from_gene_syn(syn):
         """
         strip the gene synonym down to its root
@@ -422,19 +491,17 @@ class Query:
         :return: root phrase of the synonym
         """
         root_phrase = ""
-        pattern = re.compile(fr".+?[{''.join(hyphens)}\s,]*(\d| [{''.join(numerals)}]+)+[A-z]?(\d| [{''.join(numerals)}]+)*$")
 
-        if re.search(pattern, syn) and not re.match(r"[Cc]\d+orf\d+", syn) and not re.match(r"UNQ\d+/PRO\d+", syn) \
-                and not re.match(r"KIAA\d+", syn) and not syn.startswith('type'):
-            match = re.match(
-                fr"(.+?)(TYPE|[Tt]ype)?[{''.join(hyphens)}\s,]*(\d| [{''.join(numerals)}]+)+([{''.join(hyphens)}\s,]|[A-z]|MOTIF|[Mm]otif|PROTEIN|[Pp]rotein|DOMAIN|[Dd]omain|PSEUDOGENE|[Pp]seudogene|CONTAINING|[Cc]ontaining)*(\d| [{''.join(numerals)}]+)*$",
-                syn)
+        if gene_root_regex.search(syn) and not orf_regex.match(syn) and not unq_regex.match(syn) \
+                and not kiaa_regex.match(syn) and not syn.startswith('type'):
+            match = gene_root_capture_regex.match(syn)
             root_phrase = match.group(1)
             root_phrase.strip(',- ')
 
         return root_phrase
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def systematic_family_naming_test(gene):
         """
         determine whether a gene's name suggests it is part of a similarly named family/group, and should therefore
@@ -445,9 +512,8 @@ class Query:
         """
         # if the synonym is not an ORF, UNQ or KIAA type name (these are not families), return true if the synonym ends
         # with numbers (and optionally capital letters)
-        if not re.match(r"[Cc]\d+orf\d+", gene) and not re.match(r"UNQ\d+/PRO\d+", gene) and not \
-                re.match(r"KIAA\d+", gene):
-            if re.match(r".*\d+[A-z]?\d*$", gene, re.IGNORECASE):
+        if not orf_regex.match(gene) and not unq_regex.match(gene) and not kiaa_regex.match(gene):
+            if gene_family_regex.match(gene):
                 return True
         else:
             return False
@@ -479,6 +545,18 @@ class Query:
 
         return iris
 
+    def get_gene_syn_and_iris_from_ebi_ols(self, syn, search_human_only):
+        """
+        get the iris for a gene synonym, paired with the synonym so the results of parallel lookups can be matched back
+        to their synonyms
+
+        :param str syn: gene synonym
+        :param bool search_human_only: whether to only consider human genes
+        :rtype: tuple[str, list[str]]
+        :return: the gene synonym and its list of iri strings
+        """
+        return syn, self.get_gene_syn_iris_from_ebi_ols(syn, search_human_only)
+
     def get_gene_synonyms(self, row):
         """
         collect and clean gene synonyms
@@ -503,10 +581,18 @@ class Query:
         if str(get_uniprot_syns.tax_id) == '9606':  # could be str or int, so make str
             search_human_only = True
 
-        # get the ontlogy of genes and genomes syns for the uniprot syns
+        # de-duplicate the uniprot syns (keeping their order), so each is only looked up in OLS once
+        uniprot_gene_syns = list(dict.fromkeys(uniprot_gene_syns))
+
+        # get the ontlogy of genes and genomes iris for all of the uniprot syns at once, in parallel threads rather than
+        # one OLS request after another, and map each syn to its iris
+        ReadyThready.set_logger(self.logger)
+        syn_iris = ReadyThready.go(self.get_gene_syn_and_iris_from_ebi_ols, [uniprot_gene_syns, search_human_only], 0,
+                                   n_threads=self.n_threads)
+        syn_iris = dict(syn_iris or [])
+
         for syn in uniprot_gene_syns:
-            # get iris
-            iris = self.get_gene_syn_iris_from_ebi_ols(syn, search_human_only)
+            iris = syn_iris.get(syn)
 
             if iris:
                 all_iris_for_row.extend(iris)
@@ -563,20 +649,33 @@ class Query:
         get gene synonyms and make a query string from them. Also get family roots for the gene
 
         :param list[str] row: row from df of query inputs (index, gene, id type, species, optionally keyword, gene key)
-        :return: gene query string, family roots, list of all synonyms searched
+        :return: gene query string, list of all synonyms searched, family roots
+        :rtype: tuple[str, list, list]
         """
         self.logger.info(f"{threading.current_thread().name}: Creating query part for gene '{row[1]}'")
 
         # get clean lists of synonyms for the supplied gene, and its family root phrases (e.g. ABC is the root for ABC1)
         syn_list, fam_roots = self.get_gene_synonyms(row)
-        self.gene_syns = syn_list
-        self.gene_syn_roots = fam_roots
 
         # create the gene query string
         gene_query_string = self.add_abstract_title_and_join_synonyms(syn_list)
         self.logger.info(f"{threading.current_thread().name}: Done: successfully created query part for '{row[1]}'")
 
-        return gene_query_string
+        return gene_query_string, syn_list, fam_roots
+
+    @staticmethod
+    def get_quoted_length(q_string):
+        """
+        get the length of a string after URI encoding with parse.quote_plus, by counting the bytes that would be
+        percent-encoded rather than building the encoded string
+
+        :param str q_string: the query string
+        :return: length of the encoded string
+        :rtype: int
+        """
+        encoded_bytes = q_string.encode('utf-8')
+        # each byte that is not kept as a single character becomes three characters
+        return len(encoded_bytes) + 2 * len(encoded_bytes.translate(None, quote_plus_single_chars))
 
     def estimate_query_string_length(self, q_string):
         """
@@ -589,8 +688,7 @@ class Query:
 
         # if the query part exists, then estimate its length
         if q_string:
-            encoded_query_string = parse.quote_plus(q_string)
-            len_est = len(encoded_query_string) + 12   # + 12 for the surrounding brackets, spaces, ampersand
+            len_est = self.get_quoted_length(q_string) + 12   # + 12 for the surrounding brackets, spaces, ampersand
 
         return len_est
 
@@ -604,7 +702,7 @@ class Query:
         :param str genes: query string for genes and their synonyms
         :param list kwds: list of query string for other key words
         :return: dictionary of
-                 category: {'string': string, 'len' string length, 'gr_chrs': number of greek characters in the string
+                 category: {'string': string, 'len': estimated length of the string after URI encoding}
         :rtype: dict
         """
         len_dict = {"diseases": {"string": diseases, "len": self.estimate_query_string_length(diseases)},
@@ -624,7 +722,7 @@ class Query:
         sum the lengths of the splittable strings in the dictionary (splittable strings are any strings except 'others',
         because 'others' can include settings that must be applied to every query)
 
-        :param query_len_dict: {arg: {'string': 'query items', 'len': 11, 'gr_chrs': 5}}
+        :param query_len_dict: {arg: {'string': 'query items', 'len': 11}}
         :return: an estimate for the total length of splittable query strings in the dict
         """
         lens = []
@@ -637,39 +735,66 @@ class Query:
         """
         identify the longest query strings that are causing the total query to go over the length limit
 
-        :param dict len_dict: dict containing query strings, their lengths and the number of greek characters in them
+        :param dict len_dict: dict containing query strings and their estimated lengths after URI encoding
         :param int max_length:
         :return: len_dict with longer query strings removed, long_strs dict containing the longer queries to be split
         :rtype: tuple[dict, dict]
         """
         # initialise
         long_strs = {}
+        # make a max heap of the query elements by length (with their position, so that elements of the same length are
+        # taken in the order of the dictionary). The 'others' query string shouldn't be split up; it contains search
+        # settings relevant to every query (its length was checked when created, so should usually be sufficiently
+        # short), so it isn't included
+        heap = [(-v['len'], i, k) for i, (k, v) in enumerate(len_dict.items()) if k != 'others']
+        heapq.heapify(heap)
         # sum the lengths of the query elements from the dictionary
-        len_list = self.create_query_length_list(len_dict)
-
-        while sum(len_list) > (max_length - 500):  # ensures that there are always at least 500 characters for the query
-            for key in len_dict.copy().keys():
-                # the 'others' query string shouldn't be split up; it contains search settings relevant to every
-                # query (its length was checked when created, so should usually be sufficiently short)
-                if key != "others":  # the length of 'others' isn't included in the len list
-                    # if the query string is the longest, add its relevant info to the long_strs dict
-                    if len_dict[key]['len'] == max(len_list):
-                        long_strs[key] = {'string': len_dict[key]['string']}
-                        # delete the query string's entry in the dictionary
-                        del len_dict[key]
-            # recreate the len_list from the lengths of the remaining queries in the dictionary
-            len_list = self.create_query_length_list(len_dict)
+        total_len = sum(self.create_query_length_list(len_dict))
+
+        while total_len > (max_length - 500):  # ensures that there are always at least 500 characters for the query
+            # take every query string that is the longest remaining, add its relevant info to the long_strs dict and
+            # delete its entry in the dictionary
+            longest = heap[0][0]
+            while heap and heap[0][0] == longest:
+                neg_len, _, key = heapq.heappop(heap)
+                long_strs[key] = {'string': len_dict[key]['string']}
+                del len_dict[key]
+                total_len += neg_len
 
         return len_dict, long_strs
 
-    def split_long_queries(self, len_dict, max_length, search_in_kwds):
+    def get_fields_and_lengths(self, syns):
+        """
+        create the field query for each synonym, and get the encoded lengths of each synonym and its field query. These
+        are cached for the list of synonyms, as the same synonyms (e.g. for a disease) are split for many rows
+
+        :param list syns: cleaned synonyms of a query element
+        :return: lists of the field queries, encoded synonym lengths and encoded field query lengths
+        :rtype: tuple[list, list, list]
+        """
+        cache_key = tuple(syns)
+        # the cached lists are only read by split_long_queries, so they can be shared between rows (if two threads
+        # build the same lists at once, then either result can be kept)
+        if cache_key in self.fields_and_lengths_by_syns:
+            return self.fields_and_lengths_by_syns[cache_key]
+
+        fields = [self.add_abstract_title_fields(syn) for syn in syns]
+        syn_lens = [self.get_quoted_length(syn) for syn in syns]
+        field_lens = [self.get_quoted_length(field) for field in fields]
+
+        self.fields_and_lengths_by_syns[cache_key] = fields, syn_lens, field_lens
+        return fields, syn_lens, field_lens
+
+    def split_long_queries(self, len_dict, max_length, search_in_kwds, syn_lists):
         """
         create multiple smaller queries that cover the full combinations of terms present in supplied query strings
 
-        :param dict len_dict: dict containing query strings, their lengths and the number of greek characters in them
+        :param dict len_dict: dict containing query strings and their estimated lengths after URI encoding
         :param int max_length: 8000 (URI limit) - the length of the constant parts of the URIs (base url, settings)
         :param bool search in kwds: true except for gene roots, which should not be found within the kwds field
-        :return: len_dict with longer query strings removed, list of lists of combinations of split longer query strings
+        :param dict syn_lists: the cleaned synonyms for each query element, with the same keys as len_dict
+        :return: len_dict with longer query strings removed, list of lists of the chunks of each split longer query
+            string
         :rtype: tuple[dict, list]
         """
         # initialise list of lists
@@ -699,58 +824,52 @@ class Query:
         for k, v in long_strs.items():
             # initialise variables
             syns = []
-            querystring = ""
             querystrings = []
-            i = 0
-            finished = False
-
-            # get the cleaned synonyms
-            if k == 'genes':
-                syns = copy.deepcopy(self.gene_syns)
-            elif k == 'diseases':
-                syns = copy.deepcopy(self.disease_syns)
-            elif k == 'tissues':
-                syns = copy.deepcopy(self.tissue_syns)
-            elif k.startswith("kwd"):
-                syns = copy.deepcopy(self.kwd_syn_lists[int(k.strip("kwd")) - 1])
+
+            # get the cleaned synonyms (these are not changed, as the synonyms are added to query strings by moving
+            # through the list)
+            if k in syn_lists:
+                syns = syn_lists[k]
             else:
                 self.logger.error(f"Unrecognised query element type '{k}'. Cannot split query.")
                 exit() # note: exit commands do not work when running within a thread - which this command often is
 
-            # build the query strings to be no longer than the chunk size
-            while syns:
+            # get the field query for each synonym (as added to a query string), and the encoded length of each
+            # synonym and of its field query
+            fields, syn_lens, field_lens = self.get_fields_and_lengths(syns)
+
+            # build the query strings to be no longer than the chunk size, each from the synonyms from index start up
+            # to (but not including) index end
+            start = 0
+            while start < len(syns):
+                end = start
+                querystring_len = 0
                 # calculate the length the query string will be upon the addition of the next synonym
                 #   (adding it once for each field it's searched within: field_nums, usually 2),
                 #   and if the total is lower than the chunk size then incorporate the next synonym
-                qstring_len = len(parse.quote_plus(querystring)) + (len(parse.quote_plus(syns[i])) * fields_num) + 62
-                if i == 0 and qstring_len > chunk_size:
-                    self.logger.warning(f"The {k} synonym '{syns[i]}' is too long, and will be excluded from the "
+                while end < len(syns) and querystring_len + (syn_lens[end] * fields_num) + 62 <= chunk_size:
+                    # keep a running total of the encoded length of the query string, rather than building and
+                    # encoding it for each synonym: the field query, plus 6 for the encoded brackets around the
+                    # first synonym or 4 for the encoded ' OR ' before any other synonym
+                    querystring_len += field_lens[end] + (4 if end > start else 6)
+                    end += 1
+
+                if end == start:
+                    self.logger.warning(f"The {k} synonym '{syns[start]}' is too long, and will be excluded from the "
                                         f"queries")
+                    # skip the synonym, so that the following synonyms can be added to queries
+                    start += 1
                 else:
-                    while qstring_len <= chunk_size and not finished:
-                        i += 1
-                        querystring = self.add_abstract_title_and_join_synonyms(syns=syns[:i])
-                        try:
-                            qstring_len = len(parse.quote_plus(querystring)) + \
-                                          (len(parse.quote_plus(syns[i])) * fields_num) + 62
-                        except IndexError:
-                            finished = True  # when i is no longer accessible, every syn is accounted for
-                    querystrings.append(querystring)
-                    if len(syns) >= i:
-                        del syns[:i]
-                    else:
-                        syns = []
-                    querystring = ""
-                    i = 0
+                    # build the query string from the field queries, once all of the synonyms that fit in it are known
+                    querystrings.append('(' + " OR ".join(fields[start:end]) + ')')
+                    start = end
             # add the query strings for the key to the list of chunks of query strings
             query_string_chunks.append(querystrings)
-        # create all combinations of items in all lists in the list of lists query_string_chunks
-        chunk_combinations = list(itertools.product(*query_string_chunks))
 
-        return shorter_len_dict, chunk_combinations
+        return shorter_len_dict, query_string_chunks
 
     def create_epmc_queries(self, search_description, diseases="", tissues="", others="",
-                            genes="", kwds=[], search_in_kwds=True):
+                            genes="", kwds=[], search_in_kwds=True, syn_lists=None):
         """
         create the EPMC query/queries from the supplied arguments (and their synonyms where relevant)
 
@@ -761,6 +880,7 @@ class Query:
         :param str genes: string in the format (ABSTRACT:"syn" OR TITLE:"syn" OR ABSTRACT:"syn2"...) for gene syns
         :param list kwds: list of strings in the format (ABSTRACT:"kwd" OR TITLE:"kwd"...) for key words
         :param bool search_in_kwds: whether or not to search within the kwds field (True except for gene roots)
+        :param dict syn_lists: the cleaned synonyms for each query element, used to split queries that are too long
         :return: list of strings of EPMC queries
 
         * since the introduction of the TITLE_ABS index field (Mar 2023), the string formats now use TITLE_ABS instead
@@ -769,32 +889,46 @@ class Query:
         queries = []
         self.logger.info(f"{threading.current_thread().name}: Building query")
 
-        len_dict = self.make_len_dict(diseases=diseases, tissues=tissues, genes=genes, others=others, kwds=kwds)
-
         # the character limit for EPMC API URIs (after encoding) is around 8000, so accounting for constants
         # e.g. some brackets and ampersands, the base url 'https://www.ebi.ac.uk/europepmc/webservices/rest/search'
         # and settings e.g. 'format=xml', use 7500 as the max length to be safe
 
-        # leftover amount is the number of characters that can be used after other fields have been added to the
-        # usual base query
-        leftover_amount = 7500 - len_dict['others']['len']
+        # URI encoding uses at most three characters per byte, so if the query would fit even at that length (the usual
+        # case), then it can be made in to a single query without estimating the encoded length of each part
+        max_encoded_len = sum(len(part.encode('utf-8')) * 3 + 12 for part in [diseases, tissues, others, genes, *kwds]
+                              if part)
+        too_long = False
+        if max_encoded_len + 20 > 7500:
+            len_dict = self.make_len_dict(diseases=diseases, tissues=tissues, genes=genes, others=others, kwds=kwds)
+
+            # leftover amount is the number of characters that can be used after other fields have been added to the
+            # usual base query
+            leftover_amount = 7500 - len_dict['others']['len']
 
-        # calculate the lengths of the query parts
-        query_lengths_list = self.create_query_length_list(len_dict)
+            # calculate the lengths of the query parts
+            query_lengths_list = self.create_query_length_list(len_dict)
+
+            # + 20 to approximately account for encoded brackets and ampersands added around/between queries
+            too_long = sum(query_lengths_list) + 20 > leftover_amount
 
         # if the query is longer than the leftover amount (i.e. could be too long for the server), then split it into
         # multiple smaller queries. else, make a single query.
-        # + 20 to approximately account for encoded brackets and ampersands added around/between queries
-        if sum(query_lengths_list) + 20 > leftover_amount:
+        if too_long:
             # log and initialise
             shorter_parts = []
             self.logger.info(f"{threading.current_thread().name}: Query would be too long! Creating multiple shorter "
                              f"queries for the search '{search_description}'")
 
             # identify and split query parts that are too long
-            len_dict, chunk_combinations = self.split_long_queries(len_dict, leftover_amount, search_in_kwds)
-            self.logger.info(f"{threading.current_thread().name}: {len(chunk_combinations)} shorter queries will be "
+            len_dict, query_string_chunks = self.split_long_queries(len_dict, leftover_amount, search_in_kwds,
+                                                                    syn_lists or {})
+            # a query is built for every combination of the chunks of each split query part
+            query_count = math.prod(len(chunks) for chunks in query_string_chunks)
+            self.logger.info(f"{threading.current_thread().name}: {query_count} shorter queries will be "
                              f"built for '{search_description}'")
+            if query_count > 1000:
+                self.logger.warning(f"{query_count} queries are needed for the search '{search_description}'. It may "
+                                    f"take a long time to run this many queries")
 
             # create a partial query from the shorter parts, with other settings last (if present)
             for each in len_dict.keys():
@@ -803,13 +937,15 @@ class Query:
                     shorter_parts.append(len_dict[each]["string"])
             consistent_query_string = " & ".join(shorter_parts)
 
-            for combo in chunk_combinations:  # for list in list
-                # strip the query strings add brackets
-                combo = ["(" + each.strip("(,) ") + ")" for each in combo]
-                # join the query string combinations on &
-                combo_string = " & ".join(combo)
-                # create the full query string and add to the queries list
-                queries.append(f"{combo_string} & {consistent_query_string}")
+            # strip the query strings and add brackets, once for each chunk rather than for every combination
+            bracketed_chunks = [["(" + each.strip("(,) ") + ")" for each in chunks] for chunks in query_string_chunks]
+
+            # the unsplit query parts are the same for every query, so format them as the end of the query once
+            query_end = f" & {consistent_query_string}" if consistent_query_string else ""
+
+            # iterate over the combinations of chunks lazily, as there can be very many, join each combination on & and
+            # add the full query string to the queries list
+            queries.extend(" & ".join(combo) + query_end for combo in itertools.product(*bracketed_chunks))
 
             self.logger.info(f"{threading.current_thread().name}: Done: successfully created {len(queries)} shorter "
                              f"queries to submit for the search '{search_description}'")
@@ -828,24 +964,30 @@ class Query:
             self.logger.info(f"{threading.current_thread().name}: Done: successfully built Europe PMC query")
         return queries
 
-    def get_roots_and_parts_from_family_synonyms(self):
+    def get_roots_and_parts_from_family_synonyms(self, gene_syns, gene_syn_roots):
         """
-        create a dictionary of roots of gene names and endings of gene names (e.g. ABC1 --> {ABC: [1]})
+        create a dictionary of roots of gene names and endings of gene names (e.g. ABC1 --> {ABC: [1]}). The dict is
+        cached for the synonyms and roots, as rows for the same gene have the same synonyms
 
+        :param list gene_syns: cleaned synonyms of the gene
+        :param list gene_syn_roots: family root phrases of the gene's synonyms
         :return: dict of roots and lists of specific parts
         """
+        cache_key = (tuple(gene_syns), tuple(gene_syn_roots))
+        # the cached dict is only read by later steps, so it can be shared between rows (if two threads build the same
+        # dict at once, then either result can be kept)
+        if cache_key in self.roots_and_parts_by_syns:
+            return self.roots_and_parts_by_syns[cache_key]
+
         roots_and_parts = {}
-        for root in self.gene_syn_roots:
-            syns_containing_root = []
-            for syn in self.gene_syns:
-                # if the root phrase is in the synonym, then remove it from the synonym to leave only the
-                # non-root part of the syn
-                if root in syn:
-                    syns_containing_root.append(syn.replace(root, "").strip())  # non-root part of the gene
-            # add the root and the de-duplicated list of syn parts it precedes to the dict of roots and parts
+        for root in gene_syn_roots:
+            # if the root phrase is in the synonym, then remove it from the synonym to leave only the non-root part
+            # of the syn, and add the root and the de-duplicated list of syn parts it precedes to the dict
+            syns_containing_root = {syn.replace(root, "").strip() for syn in gene_syns if root in syn}
             if syns_containing_root:
-                roots_and_parts[root] = list(set(syns_containing_root))
+                roots_and_parts[root] = list(syns_containing_root)
 
+        self.roots_and_parts_by_syns[cache_key] = roots_and_parts
         return roots_and_parts
 
     def get_query_and_kwd_strings(self, row, diseases=None, tissues=None, others=None, kwds_strings=None, kwds=None):
@@ -861,29 +1003,37 @@ class Query:
         :return: dict of gene key, search terms, queries and gene family synonyms
         """
         roots_and_parts = {}
+        root_and_syn_patterns = {}
         root_queries = []
         all_kwds = []
+        kwd_syn_lists = self.kwd_syn_lists
 
         # get keywords from the dataframe row if they were not supplied globally at the command line
         if not self.kwds:
-            kwds_strings, kwds, all_kwds = self.get_keyword_query_string_and_words(row)
+            kwds_strings, kwds, all_kwds, kwd_syn_lists = self.get_keyword_query_string_and_words(row)
 
         # create the string of search terms for the relevant output column
         search_term_string = self.get_search_terms_string(kwds)
         search_description = f"{row[1]} and {search_term_string}"
 
         # create the query string for the gene
-        gene_query_string = self.get_gene_query_string_and_roots(row)
+        gene_query_string, gene_syns, gene_syn_roots = self.get_gene_query_string_and_roots(row)
+
+        # collect the synonyms for each part of the query, for splitting queries that are too long. These are kept
+        # for this row only rather than on the query object, as rows are processed in parallel threads
+        syn_lists = {'genes': gene_syns, 'diseases': self.disease_syns, 'tissues': self.tissue_syns}
+        for i, kwd_syn_list in enumerate(kwd_syn_lists, start=1):
+            syn_lists[f"kwd{i}"] = kwd_syn_list
 
         # create the query/queries for the gene and relevant other search terms
         queries = self.create_epmc_queries(search_description, diseases=diseases, tissues=tissues, others=others,
-                                           genes=gene_query_string, kwds=kwds_strings)
+                                           genes=gene_query_string, kwds=kwds_strings, syn_lists=syn_lists)
 
         # if the gene is in a family, then also query for the root phrases of the family and add these results to a
         # separate dict to be checked for indirect references of the gene in a list (e.g. ABC2 in the list ABC1, 2)
-        if self.gene_syn_roots:
+        if gene_syn_roots:
             # get a dict of roots of gene synonyms and their counterpart non-root parts
-            roots_and_parts = self.get_roots_and_parts_from_family_synonyms()
+            roots_and_parts = self.get_roots_and_parts_from_family_synonyms(gene_syns, gene_syn_roots)
             if roots_and_parts:
                 roots = [f"{x}*" for x in roots_and_parts.keys()]
 
@@ -891,201 +1041,277 @@ class Query:
                 search_description = f"roots of {search_description}"
 
                 root_queries = self.create_epmc_queries(search_description, diseases=diseases, tissues=tissues,
-                                                        others=others, genes=gene_fam_query_string, kwds=kwds_strings)
+                                                        others=others, genes=gene_fam_query_string, kwds=kwds_strings,
+                                                        syn_lists=syn_lists)
+
+                # compile the patterns for finding the gene indirectly in lists once, before checking the documents
+                root_and_syn_patterns = self.compile_root_and_syn_part_patterns(roots_and_parts)
 
-        specifics = self.gene_syns + self.gene_syn_roots + all_kwds
+        # build the query-specific synonyms in a single list, without an intermediate list of the gene synonyms and roots
+        specifics = [*gene_syns, *gene_syn_roots, *all_kwds]
         # assemble results in to a dictionary
         queries_dict = {'gene key': row[5], 'gene name': row[1], 'search terms': search_term_string, 'queries': queries,
-                        'root_syns': roots_and_parts, 'root queries': root_queries, 'query-specific syns': specifics}
+                        'root_syns': root_and_syn_patterns, 'root queries': root_queries,
+                        'query-specific syns': specifics}
 
         return queries_dict
 
     @staticmethod
-    def extract_results_if_available(result, tag_name):
+    def get_element_content(element):
+        """
+        get the first part of the contents of an element: its text, or its first child element if it starts with one
+
+        :param lxml.etree._Element element: element of a results page
+        :return: text of the element, markup of its first child element, or None if the element is empty
+        :rtype: str or None
+        """
+        if element.text:
+            return element.text
+        if len(element):
+            # copy the child element so that the namespaces declared on the page can be removed from its markup
+            child = copy.deepcopy(element[0])
+            etree.cleanup_namespaces(child)
+            return etree.tostring(child, encoding=str, with_tail=False)
+        return None
+
+    @staticmethod
+    def extract_results_if_available(field_tags, tag_name):
         """
         tags are not always present and/or populated, so extract their contents conditionally to prevent errors
 
-        :param BeautifulSoup result: soup of a result
-        :param str tag_name: name of the tag to find in the soup
+        :param dict field_tags: first element with each field tag name in a result
+        :param str tag_name: name of the tag to extract the contents of
         :return: content of the relevant tag, or 'unavailable'
-        :rtype: bs4.element.NavigableString or string
+        :rtype: str
         """
         value = "unavailable"
-        # if the tag exists
-        if result.find(tag_name):
-            # try to extract its content
-            try:
-                value = result.find(tag_name).contents[0]
-            # if the tag has no contents, then ignore it
-            except IndexError:
-                pass
+        # if the tag exists and has contents, then extract them
+        if tag_name in field_tags:
+            content = Query.get_element_content(field_tags[tag_name])
+            if content is not None:
+                value = content
         return value
 
-    def get_relevant_info_from_results(self, result_soup):
+    def get_relevant_info_from_results(self, result):
         """
         add relevant details about each result to the dictionary of result details
 
-        :param BeautifulSoup result_soup: soup of xml for a result (publication)
+        :param lxml.etree._Element result: element of xml for a result (publication)
         :return: dict of relevant info for the doc
         """
         # initialise
+        field_tags = {}
         keywords = []
+        comments = []
         preprint_of = "nothing"
 
+        # find the first tag of each field, and all keyword and comment correction tags, in a single pass over the
+        # result's elements
+        for tag in result.iter(*result_field_tags, 'keyword', 'commentCorrection'):
+            if tag.tag == 'keyword':
+                # add each keyword to the list of keywords (or leave the list empty if there are no keyword tags in
+                # the doc), ignoring empty keyword tags
+                keyword = self.get_element_content(tag)
+                if keyword is not None:
+                    keywords.append(keyword)
+            elif tag.tag == 'commentCorrection':
+                comments.append(tag)
+            elif tag.tag not in field_tags:
+                field_tags[tag.tag] = tag
+
         # there should always be an ID and source tag, as these are used by EPMC to create a URL for the document
-        pub_id = result_soup.find('id').contents[0]
-        url = f"https://europepmc.org/abstract/{result_soup.find('source').contents[0]}/{pub_id}"
+        pub_id = self.get_element_content(field_tags['id'])
+        url = f"https://europepmc.org/abstract/{self.get_element_content(field_tags['source'])}/{pub_id}"
 
         # if a standard tag is present, assign its value to the variable. else, assign "unavailable"
-        title = self.extract_results_if_available(result_soup, 'title')
-        year = self.extract_results_if_available(result_soup, 'pubyear')
-        authorstring = self.extract_results_if_available(result_soup, 'authorstring')
-        abstract = self.extract_results_if_available(result_soup, 'abstracttext')
-        p_types = self.extract_results_if_available(result_soup, 'pubtype')
-
-        # add each keyword to the list of keywords (or leave the list empty if there are no keyword tags in the doc)
-        for res in result_soup.find_all('keyword'):
-            try:
-                keywords.append(res.contents[0])
-            # handle empty keyword tags (i.e. ignore them)
-            except IndexError:
-                pass
+        title = self.extract_results_if_available(field_tags, 'title')
+        year = self.extract_results_if_available(field_tags, 'pubYear')
+        authorstring = self.extract_results_if_available(field_tags, 'authorString')
+        abstract = self.extract_results_if_available(field_tags, 'abstractText')
+        p_types = self.extract_results_if_available(field_tags, 'pubType')
 
         if pub_id.startswith("PPR"):
-            comment_list = result_soup.find_all('commentcorrection')
-            for comment in comment_list:
-                comment_type = comment.find('type')
-                if comment_type.contents[0] == "Preprint of":
-                    preprint_of = comment.find('id').contents[0]
+            for comment in comments:
+                if self.get_element_content(comment.find('.//type')) == "Preprint of":
+                    preprint_of = self.get_element_content(comment.find('.//id'))
 
         return pub_id, {"ID": pub_id, "Title": title, "Year": year, "Author": authorstring, "Publication type": p_types,
                         "Abstract": abstract, "Keywords": keywords, "url": url, "prep_of": preprint_of}
 
-    def parse_potential_result_content_for_relevant_info(self, res, ignore_ids):
+    def parse_results_page(self, res, ignore_ids=()):
+        """
+        parse the xml of a Europe PMC results page as it is downloaded (recovering what it can from malformed xml),
+        extracting the relevant information from each result and then discarding the result's elements, so that the
+        whole page is never held in memory
+
+        :param requests.Response res: streamed response for the results page
+        :param set ignore_ids: ids of results to leave out of the page
+        :return: dict of the hit count, next cursor mark (None if there is no next page), query string, and list of
+            (ID, dict of relevant info) for each result
+        :rtype: dict
+        """
+        page = {'hitCount': None, 'nextCursorMark': None, 'queryString': None, 'results': []}
+
+        # decompress the response as it is read, if it was sent compressed
+        res.raw.decode_content = True
+        for event, element in etree.iterparse(res.raw, tag=list(results_page_parent_tags), recover=True,
+                                              huge_tree=True):
+            parent = element.getparent()
+            # ignore tags with the same names elsewhere in the page (e.g. within a result)
+            if parent is None or parent.tag != results_page_parent_tags[element.tag]:
+                continue
+
+            if element.tag == 'result':
+                if self.get_element_content(element.find('.//id')) not in ignore_ids:
+                    page['results'].append(self.get_relevant_info_from_results(element))
+                # discard the result, and the results before it, now that its information has been extracted
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+            else:
+                page[element.tag] = self.get_element_content(element)
+        return page
+
+    def parse_potential_result_content_for_relevant_info(self, page):
         """
         result contents can be large, so perform initial parsing to collect just the relevant information
 
-        :param str res: string of XML result page
-        :param list ignore_ids: list of ids to ignore
+        :param dict page: parsed XML result page, from parse_results_page
         :return: list of dicts of relevant info for each document,
         """
-        doc_info_list = []
+        # dict of relevant info for each document by ID, so that documents listed more than once are only kept once
+        doc_info_by_id = {}
         cursor_mark = "*"
 
-        # get soup
-        whole_results_soup = BeautifulSoup(res, features='lxml')
-
-        # get the next page cursor code from the soup
-        # EDIT: now using a try, because the tag is no longer present in the XML if there is not a next page
-        try:
-            cursor_mark = whole_results_soup.find("nextcursormark").contents[0]
-        except AttributeError:
+        # get the next page cursor code from the page
+        # EDIT: now checking for the tag, because the tag is no longer present in the XML if there is not a next page
+        if page['nextCursorMark'] is not None:
+            cursor_mark = page['nextCursorMark']
+        else:
             self.logger.info(f"No next cursor mark element in results")
 
         # get the hit count
-        hit_count = whole_results_soup.find("hitcount").contents[0]
+        hit_count = page['hitCount']
 
         # for each result listed in the page, get its important information
-        result_tags = whole_results_soup.find_all("result")
-        if result_tags:
-            for result_tag in result_tags:
-                if result_tag.id.contents[0] not in ignore_ids:
-                    doc_id, doc_info_dict = self.get_relevant_info_from_results(result_tag)
-                    doc_info_list.append(doc_info_dict)
-
-        unique_docs = list({v['ID']: v for v in doc_info_list}.values())
+        for doc_id, doc_info_dict in page['results']:
+            doc_info_by_id[doc_id] = doc_info_dict
 
-        return unique_docs, cursor_mark, hit_count
+        return list(doc_info_by_id.values()), cursor_mark, hit_count
 
-    def parse_actual_result_content_for_relevant_info(self, result_text_list):
+    def parse_actual_result_content_for_relevant_info(self, result_pages):
         """
         result contents can be large, so perform initial parsing to collect just the relevant information
 
-        :param list result_text_list: list of strings of XML result pages
+        :param list result_pages: list of parsed XML result pages, from parse_results_page
         :return: string of query strings used, list of dicts of relevant info for each document, list of doc IDs found
         :rtype: tuple(str, list, list)
         """
         string_number = 0
         query_strings = []
-        doc_info_list = []
-        id_list = []
-
-        for res in result_text_list:
-            # get soup
-            whole_results_soup = BeautifulSoup(res, features='lxml')
+        # dict of relevant info for each document by ID and set of IDs found, so that documents found by more than
+        # one query are only kept once
+        doc_info_by_id = {}
+        id_set = set()
 
+        for page in result_pages:
             # get the number of results and query string for the results page, log them, and add the string and its
             # index number to the list of query strings to be printed in the output files
-            result_count = whole_results_soup.hitcount.contents[0]
-            query_string = whole_results_soup.querystring.contents[0]
+            result_count = page['hitCount']
+            query_string = page['queryString']
             self.logger.info(f"{threading.current_thread().name}: {result_count} results found for the query string "
                              f"'{query_string}'")
             string_number += 1
             query_strings.append(f"{string_number}: {query_string}")
 
             # for each result listed in the page, get its important information
-            result_tags = whole_results_soup.find_all("result")
-            if result_tags:
-                for result_tag in result_tags:
-                    doc_id, doc_info_dict = self.get_relevant_info_from_results(result_tag)
-                    doc_info_list.append(doc_info_dict)
-                    id_list.append(str(doc_id))
+            if page['results']:
+                for doc_id, doc_info_dict in page['results']:
+                    doc_info_by_id[doc_id] = doc_info_dict
+                    id_set.add(doc_id)
             else:
                 # create an empty dict of relevant headings if there were no results returned
-                doc_info_list.append({"ID": "none", "Title": "", "Year": "", "Author": "", "Publication type": "",
-                                      "Abstract": "", "Keywords": "", "url": "", "prep_of": ""})
-
-        # make unique
-        unique_docs = list({v['ID']: v for v in doc_info_list}.values())
-        unique_ids = list(set(id_list))
+                doc_info_by_id["none"] = {"ID": "none", "Title": "", "Year": "", "Author": "", "Publication type": "",
+                                          "Abstract": "", "Keywords": "", "url": "", "prep_of": ""}
 
         # make single string
         string_of_queries = " split_here ".join(query_strings)
 
-        return string_of_queries, unique_docs, unique_ids
+        return string_of_queries, list(doc_info_by_id.values()), list(id_set)
 
     def run_epmc_query(self, query):
         """
-        run the supplied EPMC query and return the first page of results (up to 1000 results; no need to collect more)
+        run the supplied EPMC query and parse the first page of results (up to 1000 results; no need to collect more)
+        as it is downloaded
 
         :param str query: the query string to search for
-        :return: EPMC query response
+        :return: parsed EPMC results page
         :raises HTTPError: if a HTTP error occurs
         :raises ConnectionError: if a connection error occurs
         """
-        res_text = "No result text"
+        page = None
 
-        # run the query and collect its content, or return appropriate errors
+        # run the query and parse its content as it is streamed, or return appropriate errors
         try:
             self.logger.info(f"{threading.current_thread().name} Querying Europe PMC for {query}")
-            res = requests.get('https://www.ebi.ac.uk/europepmc/webservices/rest/search',
-                               headers={'Content-type': "application/x-www-form-urlencoded"},
-                               params={'query': query,
-                                       'resultType': 'core',
-                                       'pageSize': 1000,
-                                       'format': 'xml'}
-                               )
-            res.raise_for_status()
-            res_text = res.content  # use content rather than text to ensure proper encoding of greek characters etc
-            # log status code of response and close connection
-            self.logger.info(f"{threading.current_thread().name}: {res}")
-            res.close()
-
-        # raise relevant exceptions if there are errors for the request
-        except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError) as err:
+            # the connection is released back to the session's pool when the response is closed on leaving the with
+            # block, even if the request or parsing fails
+            with self.session.get('https://www.ebi.ac.uk/europepmc/webservices/rest/search',
+                                  headers={'Content-type': "application/x-www-form-urlencoded"},
+                                  params={'query': query,
+                                          'resultType': 'core',
+                                          'pageSize': 1000,
+                                          'format': 'xml'},
+                                  stream=True
+                                  ) as res:
+                res.raise_for_status()
+                # parse the raw bytes rather than text to ensure proper encoding of greek characters etc
+                page = self.parse_results_page(res)
+                # log status code of response
+                self.logger.info(f"{threading.current_thread().name}: {res}")
+
+        # raise relevant exceptions if there are errors for the request (including while the response is streamed)
+        except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError, urllib3.exceptions.HTTPError) \
+                as err:
             self.logger.error(err)
             exit() # note: exit commands do not work when running within a thread - which this command often is
 
-        return res_text
+        return page
+
+    @staticmethod
+    def compile_root_and_syn_part_patterns(roots_and_parts):
+        """
+        compile the patterns for lists that indirectly contain the gene (e.g. "ABC1, 2 and 3" contains ABC2 and ABC3)
+        once for each root and synonym part, rather than for every document that is checked
 
-    def analyse_text_for_gene_in_list(self, abstract, title, root_and_syn_part, doc_id):
+        :param dict roots_and_parts: root phrases are keys, lists of synonyms with root phrases removed are values
+        :return: lowercase root phrases as keys, lists of (lowercase synonym part, compiled pattern, synonym) as values
+        :rtype: dict
+        """
+        root_and_syn_patterns = {}
+        for root, syn_part_list in roots_and_parts.items():
+            root_lower = root.lower()
+            syn_patterns = root_and_syn_patterns.setdefault(root_lower, [])
+            for syn_part in syn_part_list:
+                syn_part_lower = syn_part.lower()
+                # the structure "root phrase optionally followed by ', s and/or spaces, optionally followed by any
+                # number of comma-separated numbers with optional letters (e.g. '1, 1A1'), non-optionally followed
+                # by [and , or] and the relevant part of the synonym"
+                pattern = re.compile(fr"{root_lower}'?({hyphen_alternatives}|\s)*\d+[a-z]?\d*"
+                                     fr"({hyphen_alternatives}|\s)*(,({hyphen_alternatives}|\s)*\d+[a-z]?\d*)*"
+                                     fr"(and|or|,)\s({hyphen_alternatives}|\s)*{syn_part_lower}")
+                syn_patterns.append((syn_part_lower, pattern, f"{root}{syn_part}"))
+        return root_and_syn_patterns
+
+    def analyse_text_for_gene_in_list(self, abstract, title, root_and_syn_patterns, doc_id):
         """
         check the abstract and title for lists that indirectly contain the gene of interest (e.g. the list
         "ABC1, 2 and 3" contains ABC2 and ABC3 indirectly). return true if either contains a relevant list
 
         :param bs4.element.NavigableString abstract: abstract text (extracted from soup)
         :param bs4.element.NavigableString title: title text (extracted from soup)
-        :param dict root_and_syn_part: root phrases are keys, lists of synonyms with root phrases removed are values
+        :param dict root_and_syn_patterns: lowercase root phrases are keys, lists of (lowercase synonym part, compiled
+            pattern, synonym) are values, as returned by compile_root_and_syn_part_patterns
         :param str doc_id: document ID
         :return: bool: True if the abstract contains the gene of interest
         """
@@ -1093,20 +1319,17 @@ class Query:
 
         # if the text contains a root and any associated synonym part, then check if the root and synonym are in a
         # list-type structure
-        for root, syn_part_list in root_and_syn_part.items():
-            if root.lower() in text:
-                for syn_part in syn_part_list:
-                    if syn_part.lower() in text:
-                        # if the text contains the structure "root phrase optionally followed by ', s and/or
-                        # spaces, optionally followed by any number of comma-separated numbers with optional
-                        # letters (e.g. '1, 1A1'), non-optionally followed by [and , or] and the relevant part
-                        # of the synonym", then return True
-                        if re.match(fr".*{root.lower()}'?({'|'.join(hyphens)}|\s)*\d+[a-z]?\d*({'|'.join(hyphens)}|\s)*"
-                                    fr"(,({'|'.join(hyphens)}|\s)*\d+[a-z]?\d*)*"
-                                    fr"(and|or|,)\s({'|'.join(hyphens)}|\s)*{syn_part.lower()}.*", text):
-                            self.logger.info(
-                                f"Document {doc_id} contains the synonym '{root}{syn_part}' indirectly in a list")
-                            return True
+        for root, syn_patterns in root_and_syn_patterns.items():
+            root_pos = text.find(root)
+            if root_pos != -1:
+                for syn_part, pattern, syn in syn_patterns:
+                    # a list can only start at the first occurrence of the root or later, and can only end with the
+                    # last occurrence of the synonym part, so only search that part of the text (or skip the search
+                    # if the synonym part does not occur after the root)
+                    syn_part_pos = text.rfind(syn_part, root_pos + len(root))
+                    if syn_part_pos != -1 and pattern.search(text, root_pos, syn_part_pos + len(syn_part)):
+                        self.logger.info(f"Document {doc_id} contains the synonym '{syn}' indirectly in a list")
+                        return True
         return False
 
     def run_epmc_query_all_results(self, query, res_count, id_list, root_and_syn_parts, gene_name):
@@ -1115,8 +1338,9 @@ class Query:
 
         :param str query: the query string to search for
         :param int res_count: the number of actual results
-        :param list id_list: the list of IDs of actual results:
-        :param dict root_and_syn_parts: dict containing syn roots and their final parts (e.g. {'ABC': ['3']}
+        :param set id_list: the set of IDs of actual results
+        :param dict root_and_syn_parts: dict containing lowercase syn roots and their final parts with compiled list
+            patterns (e.g. {'abc': [('3', re.compile(...), 'ABC3')]}
         :param str gene_name: gene name
         :return: list of dicts of relevant information from relevant documents
         :raises HTTPError: if a HTTP error occurs
@@ -1129,33 +1353,37 @@ class Query:
 
         while continue_querying and res_count <= 1000:
             run_number += 1
-            res_text = "No result text"
+            page = None
 
-            # run the query and collect its content, or return appropriate errors
+            # run the query and parse its content as it is streamed (leaving out results already found), or return
+            # appropriate errors
             try:
                 self.logger.info(f"{threading.current_thread().name} Querying Europe PMC with root query {run_number}: "
                                  f"{query}")
-                res = requests.get('https://www.ebi.ac.uk/europepmc/webservices/rest/search',
-                                   headers={'Content-type': "application/x-www-form-urlencoded"},
-                                   params={'query': query,
-                                           'resultType': 'core',
-                                           'pageSize': 1000,
-                                           'format': 'xml',
-                                           'cursorMark': c_mark}
-                                   )
-                res.raise_for_status()
-                res_text = res.content  # use content rather than text to ensure proper encoding of greek characters etc
-                # log status code of response and close connection
-                self.logger.info(f"{threading.current_thread().name}: {res}")
-                res.close()
-
-            # raise relevant exceptions if there are errors for the request
-            except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError) as err:
+                # the connection is released back to the session's pool when the response is closed on leaving the
+                # with block, even if the request or parsing fails
+                with self.session.get('https://www.ebi.ac.uk/europepmc/webservices/rest/search',
+                                      headers={'Content-type': "application/x-www-form-urlencoded"},
+                                      params={'query': query,
+                                              'resultType': 'core',
+                                              'pageSize': 1000,
+                                              'format': 'xml',
+                                              'cursorMark': c_mark},
+                                      stream=True
+                                      ) as res:
+                    res.raise_for_status()
+                    # parse the raw bytes rather than text to ensure proper encoding of greek characters etc
+                    page = self.parse_results_page(res, id_list)
+                    # log status code of response
+                    self.logger.info(f"{threading.current_thread().name}: {res}")
+
+            # raise relevant exceptions if there are errors for the request (including while the response is streamed)
+            except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError,
+                    urllib3.exceptions.HTTPError) as err:
                 self.logger.error(err)
                 exit() # note: exit commands do not work when running within a thread - which this command often is
 
-            potential_doc_info, c_mark, hit_count = \
-                self.parse_potential_result_content_for_relevant_info(res_text, id_list)
+            potential_doc_info, c_mark, hit_count = self.parse_potential_result_content_for_relevant_info(page)
 
             if int(hit_count) > 5000 and run_number == 1:
                 self.logger.warning(f"{hit_count} results were identified when searching for a root of a synonym of "
@@ -1177,6 +1405,29 @@ class Query:
                 continue_querying = False
         return res_info
 
+    def run_queries_in_threads(self, query_func, queries, *args):
+        """
+        run a query function for each query in a pool of threads, which each take the next query as soon as they are
+        free. errors are logged rather than raised, so that the results of the other queries are kept
+
+        :param query_func: function to run for each query (run_epmc_query or run_epmc_query_all_results)
+        :param list queries: the query strings to search for
+        :param args: further arguments to pass to the function after the query
+        :return: list of the results of each successful query, in the order of the queries
+        :rtype: list
+        """
+        results = []
+        # if no number of threads was given (0), use the executor's default number of threads
+        with ThreadPoolExecutor(max_workers=self.n_threads or None) as executor:
+            jobs = [executor.submit(query_func, query, *args) for query in queries]
+            for job in jobs:
+                try:
+                    results.append(job.result())
+                # the query functions exit if a request fails (which only ends the thread the query is running in)
+                except (Exception, SystemExit) as err:
+                    self.logger.error(f"{err.__class__}: Results error from {query_func.__name__}: {err}")
+        return results
+
     def run_queries_and_get_results(self, queries_dict):
         """
         run the generated Europe PMC queries and add their results to the dictionary
@@ -1184,8 +1435,7 @@ class Query:
         :param queries_dict: dict of gene key, search terms, queries and family synonyms
         :return: dictionary of gene keys and relevant information about query results for the output
         """
-        # initialise job handler and potential results list
-        ReadyThready.set_logger(self.logger)
+        # initialise potential results list
         root_doc_info = []
 
         # extract the lists of queries from the dict
@@ -1194,23 +1444,25 @@ class Query:
         root_and_syn_parts = queries_dict['root_syns']
 
         self.logger.info(f"Running {len(queries)} queries in Europe PMC for '{queries_dict['gene name']}'")
-        result_text = ReadyThready.go(self.run_epmc_query, [queries], 0, self.n_threads)
+        result_pages = self.run_queries_in_threads(self.run_epmc_query, queries)
         self.logger.info(f"Done running '{queries_dict['gene name']}' queries in Europe PMC")
-        query_strings, doc_info, id_list = self.parse_actual_result_content_for_relevant_info(result_text)
+        query_strings, doc_info, id_list = self.parse_actual_result_content_for_relevant_info(result_pages)
 
         res_count = len(id_list)
 
         if root_qs and res_count < 1000:
             self.logger.info(f"Running {len(root_qs)} queries in Europe PMC for "
                              f"roots of '{queries_dict['gene name']}'")
-            root_results = ReadyThready.go(self.run_epmc_query_all_results,
-                                           [root_qs, res_count, id_list, root_and_syn_parts, queries_dict['gene name']],
-                                           0, self.n_threads)
+            # the IDs of the actual results are checked for every root query result, so look them up in a set (shared by
+            # all of the root queries, as it is not changed)
+            id_set = set(id_list)
+            root_results = self.run_queries_in_threads(self.run_epmc_query_all_results, root_qs, res_count, id_set,
+                                                       root_and_syn_parts, queries_dict['gene name'])
             # flatten list (list of items expected, not list of lists)
             self.logger.info(f"Done running '{queries_dict['gene name']}' root "
                              f"queries in Europe PMC")
 
-            root_doc_info = [item for sublist in root_results for item in sublist]
+            root_doc_info = list(itertools.chain.from_iterable(root_results))
             # print(len(root_doc_info))
             doc_info.extend(root_doc_info)
 
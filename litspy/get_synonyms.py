@@ -1,18 +1,115 @@
 import requests
 import json
+import sqlite3
 import re
-from time import sleep
 import threading
+import functools
+import itertools
+import bisect
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from rtgo import ReadyThready
 
+from litspy.http_session import HttpSession, RateLimiter, ResponseCache
 import litspy.alternative_characters as chars
 import litspy.noisy_phrases as noise
 from litspy.anatomy_qualifiers import anatomy_qualifiers as anatomy_qualifiers
 
+# noise indicators in upper case, for case-insensitive substring checks without converting them for every synonym
+upper_noise_indicators = tuple(noisy_term.upper() for noisy_term in noise.synonym_noise_indicators)
+
+# translation table to replace punctuation (and hyphens) with spaces in a single pass over a synonym: some synonyms use
+# punctuation instead of spaces, EPMC handles commas/no commas, and it treats spaces/hyphens/dashes the same
+punctuation_table = str.maketrans(dict.fromkeys(["_", ",", "?", "\"", "“", "”", *chars.hyphens], " "))
+# translation table to replace brackets (EPMC handles brackets/no brackets) and newlines with spaces, once brackets and
+# their contents have been removed from a synonym
+bracket_table = str.maketrans(dict.fromkeys(["(", ")", "\n"], " "))
+# phrases to replace with spaces in a single pass over a synonym: "EXACT" is commonly added to the end of synonyms, and
+# the others are common phrases
+noise_phrases_regex = re.compile("|".join(map(re.escape, ["EXACT", "susceptibility to", "working designation"])))
+
+# the page number parameter in the url of an EBI OLS results page, captured up to the number
+page_number_regex = re.compile(r"([?&]page=)\d+")
+
+# regexes used to clean every synonym, compiled once rather than looked up in the re module's cache for each synonym
+numbers_regex = re.compile(r"\d+")
+# brackets containing digits or numerals, and brackets with any other contents
+bracket_number_regex = re.compile(fr"\(.*[{chars.numeral_chars}\d]+.*\)")
+bracket_content_regex = re.compile(r"[\(\[]+.*?[\)\]]+")
+multiple_spaces_regex = re.compile(r"\s{2,}")
+whitespace_regex = re.compile(r"\s+")
+# a single capital letter followed by digits, e.g. A10
+letter_number_regex = re.compile(r"[A-Z]\d+$")
+# synonyms in formats that should not have spaces added before their numbers: orf, UNQ and KIAA codes, p53/A4 and
+# abbreviations such as AIM1
+orf_regex = re.compile(r"[Cc]\d+orf\d+")
+unq_regex = re.compile(r"UNQ\d+/PRO\d+")
+kiaa_regex = re.compile(r"KIAA\d+")
+short_letter_number_regex = re.compile(r"[A-z]\d{1,3}")
+abbreviation_number_regex = re.compile(r"(CI|RR|AIM|FBS|IOP)\d+")
+# numbers (and optionally capital letters) that are not preceded by hyphens, numbers or spaces
+number_in_gene_regex = re.compile(r".*[^\s\d]+\d+\s*[A-z]?[\s\d]*\b")
+# one or more numbers, plus optional capital letters, preceded by a space
+spaced_number_in_gene_regex = re.compile(r"\s+\d+\s*[A-z]?[\s\d]*\b")
+# phrases containing types: a hyphen followed by "type", and "type" followed by numbers, numerals, a letter and/or the
+# names and characters of the greek letters handled in the alternative characters module
+x_hyphen_type_regex = re.compile(fr"(.+\s*[{chars.hyphen_chars}]\s*[Tt][Yy][Pp][Ee])")
+type_x_regex = re.compile(fr"^.*([Tt][Yy][Pp][Ee][\s\d{chars.numeral_chars}]*\b[a-zA-Z]?\b[\s\d"
+                          fr"{chars.numeral_chars}]*({'|'.join([*chars.greek_dict, *chars.greek_char_variants])})*"
+                          fr"[\s\d]*)")
+# translation table to replace dotless and dotted i with i before case folding synonyms: case-insensitive regexes match
+# them with i, but case folding does not
+dotted_i_table = str.maketrans({"ı": "i", "İ": "i"})
+
+# the names of the greek letters found at every position in a synonym, in a single pass: the names are in lookaheads,
+# so that names within other names are also found (e.g. 'eta' in 'beta'), and each is in a group named after it
+greek_names_regex = re.compile("|".join(fr"(?=(?P<{key}>{key}))" for key in chars.greek_dict), flags=re.IGNORECASE)
+# for each greek letter name: regexes for the name followed by a number (e.g. 'gamma 2'), the name, and the name as a
+# separate word or surrounded by non-letters
+greek_name_regexes = {key: (re.compile(fr"{key}\s?\d+", flags=re.IGNORECASE), re.compile(key, flags=re.IGNORECASE),
+                            re.compile(fr".*(\b{key}\b|[^a-zA-Z]{key}[^a-zA-Z])", flags=re.IGNORECASE))
+                      for key in chars.greek_dict}
+# for each greek character, the character in upper case and a regex for the character followed by a number
+greek_char_number_regexes = {char: (char.upper(), re.compile(fr"{char}\s?\d+", flags=re.IGNORECASE))
+                             for char in chars.greek_char_variants}
+
+chain_regex = re.compile("chain", flags=re.IGNORECASE)
+chains_regex = re.compile("chains", flags=re.IGNORECASE)
+
+# marks the threads of the shared pool of OLS threads, so that requests started from within the pool are made in the
+# same thread rather than queued in the pool behind the thread waiting for them
+ols_thread_state = threading.local()
+
+
+def mark_ols_pool_thread():
+    """
+    mark the current thread as one of the threads of the shared pool of OLS threads (run as each thread starts)
+
+    :return: None
+    """
+    ols_thread_state.in_pool = True
+
 
 class OLSRequests:
     """class for making requests to the EBI OLS"""
 
+    # parsed responses for each url requested, shared by all instances so that urls requested for more than one search
+    # (e.g. for a keyword or gene synonym used in several searches) are only requested once
+    response_cache = {}
+    cache_lock = threading.Lock()
+
+    # session shared by all instances and threads, so that connections to OLS are kept alive and reused rather than
+    # opened for every request
+    session = HttpSession.create_session()
+    # limit on the rate of requests to OLS from all threads together, to prevent sending too many requests
+    rate_limiter = RateLimiter(rate=20, burst=20)
+    # responses cached on disk by previous runs (for a week), so that they are not requested again by every run
+    disk_cache = ResponseCache('ols_cache.sqlite', max_age=7 * 24 * 60 * 60)
+    # pool of threads shared by all instances for making requests at the same time. It is bounded, so that the number
+    # of threads does not multiply when terms, their iris and their pages are all requested at once: more threads than
+    # this would only wait on the rate limiter
+    executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="OLS", initializer=mark_ols_pool_thread)
+
     def __init__(self, original_term, logger):
         """
         initialise with logger and the argument supplied at the command line
@@ -23,33 +120,109 @@ class OLSRequests:
         self.logger = logger
         self.original_term = original_term
 
+    def run_in_pool(self, func, items, *args):
+        """
+        run the function for each item in the shared pool of OLS threads, or one item after another in the current
+        thread if it is already one of the pool's threads (so that the pool's threads never wait on tasks queued behind
+        them). Errors are logged rather than raised, so that the results for the other items are kept
+
+        :param func: function to run for each item (e.g. get_json_for_full_url or get_syns_for_iri)
+        :param list items: the items to run the function for (e.g. urls or iris)
+        :param args: further arguments to pass to the function after each item
+        :return: the result for each item that did not raise an error, in the order of the items, as it is received
+        :rtype: generator
+        """
+        if getattr(ols_thread_state, 'in_pool', False):
+            calls = (functools.partial(func, item, *args) for item in items)
+        else:
+            # submit every item before waiting for any result, so that they are all run at the same time
+            calls = [self.executor.submit(func, item, *args).result for item in items]
+        for call in calls:
+            try:
+                yield call()
+            # requests exit on errors, which should only end the task for this item rather than the whole search
+            except (Exception, SystemExit) as err:
+                self.logger.error(f"{err.__class__}: Error from {func.__name__} for '{self.original_term}': {err}")
+
     def get_request_parse_result(self, url):
         """
-        get request for the url, or raise relevant exceptions and parse the result in to a dict
+        get request for the url, or raise relevant exceptions and parse the result in to a dict. Results are cached, so
+        each url is only requested once, and requests that are not cached are rate limited. Responses are also cached on
+        disk, so that they are reused by later runs
 
         :param str url: url
         :return: information parsed from the request result
         :rtype: dict
         :raises HTTPError: if a HTTP error occurs
         :raises ConnectionError: if a connection error occurs
+        :raises Timeout: if OLS does not respond in time
+        """
+        # return the cached result if the url has already been requested
+        with self.cache_lock:
+            if url in self.response_cache:
+                self.logger.info(f"{threading.current_thread().name}: Using cached response for {url}")
+                return self.response_cache[url]
+
+        # use the response cached on disk if a recent run requested the url, otherwise request it
+        content = self.get_content_from_disk_cache(url)
+        if content is not None:
+            self.logger.info(f"{threading.current_thread().name}: Using response cached on disk for {url}")
+            parsed_json = json.loads(content)
+        else:
+            # wait until the request can be sent without sending too many requests
+            self.rate_limiter.wait()
+            self.logger.info(f"{threading.current_thread().name}: Requesting {url}")
+            # make the request, with timeouts for connecting and for each read of the response
+            try:
+                res = self.session.get(url, timeout=(3, 30))
+                res.raise_for_status()
+            # raise relevant exceptions if there are errors for the request
+            except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as err:
+                self.logger.error(err)
+                exit() # note: exit commands do not work when running within a thread - which this command often is
+            # log status code of response
+            self.logger.info(f"{threading.current_thread().name}: {res} for {url}")
+            # parse the content of the response in to a dict, straight from its bytes (JSON is UTF-encoded, and json
+            # detects which encoding), rather than first decoding it to text by guessing its character set
+            parsed_json = json.loads(res.content)
+            # cache the content on disk once it has been parsed successfully
+            self.save_content_to_disk_cache(url, res.content)
+        # cache and return parsed JSON
+        with self.cache_lock:
+            self.response_cache[url] = parsed_json
+        return parsed_json
+
+    def get_content_from_disk_cache(self, url):
+        """
+        get the content of the response for the url from the cache on disk, turning the cache off if it cannot be read
+
+        :param str url: url
+        :return: content of the cached response, or None if there is no recent response for the url
+        :rtype: bytes or None
         """
-        self.logger.info(f"{threading.current_thread().name}: Requesting {url}")
-        # make the request
         try:
-            res = requests.get(url)
-            res.raise_for_status()
-        # raise relevant exceptions if there are errors for the request
-        except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError) as err:
-            self.logger.error(err)
-            exit() # note: exit commands do not work when running within a thread - which this command often is
-        # log status code of response
-        self.logger.info(f"{threading.current_thread().name}: {res} for {url}")
-        # parse the test of the response in to a dict
-        parsed_json = json.loads(res.text)
-        # close the connection
-        res.close()
-        # return parsed JSON
-        return parsed_json
+            return self.disk_cache.get(url)
+        except sqlite3.Error as err:
+            self.logger.warning(f"Unable to read cached EBI OLS responses from '{self.disk_cache.path}' due to {err}. "
+                                f"Responses will not be cached on disk")
+            self.disk_cache.enabled = False
+            return None
+
+    def save_content_to_disk_cache(self, url, content):
+        """
+        save the content of the response for the url to the cache on disk, turning the cache off if it cannot be written
+
+        :param str url: url
+        :param bytes content: content of the response
+        :return: None
+        """
+        try:
+            self.disk_cache.set(url, content)
+        except sqlite3.Error as err:
+            self.logger.warning(f"Unable to cache EBI OLS responses in '{self.disk_cache.path}' due to {err}. "
+                                f"Responses will not be cached on disk")
+            self.disk_cache.enabled = False
 
     def get_iris(self, search_settings=None):
         """
@@ -58,9 +231,8 @@ class OLSRequests:
         :param str search_settings: optional string of search settings, e.g. ontology=ontology_name
         :return: list of unique IRIs
         """
-        # initialise the iri list, and prevent performing too many requests if this method is called in a loop
+        # initialise the iri list
         iris = []
-        sleep(0.1)
 
         # replace any spaces in the term with +, for the url
         term = self.original_term.replace(" ", "+")
@@ -99,8 +271,6 @@ class OLSRequests:
         :return: dict response text parsed in to a dict
         :rtype: dict
         """
-        # prevent performing too many requests if this method is called in a loop
-        sleep(0.1)
         self.logger.info(f"{threading.current_thread().name}: Querying {iri} for synonyms of '{self.original_term}'")
         # get response for the IRI
         url = f"http://www.ebi.ac.uk/ols/api/terms?iri={iri}&size=1000"
@@ -124,6 +294,7 @@ class OLSRequests:
 
 class ExtractOLSSynonyms:
     """class for extracting and cleaning synonyms from OLS's json-derived dicts"""
+
     def __init__(self, original_term, logger, min_syn_len, n_threads=0):
         """
         initialise synonyms object with logger, original term, synonym list, headers, noise greek letters
@@ -137,35 +308,34 @@ class ExtractOLSSynonyms:
         self.original_term = original_term
         self.min_syn_len = min_syn_len
         self.n_threads = n_threads
-        self.syns = []
+        # synonyms are kept in a set, so that they are de-duplicated as they are added rather than by copying them
+        self.syns = set()
+        # synonyms are extracted from pages and terms in several threads at once, so add them to the set under a lock
+        self.syns_lock = threading.Lock()
 
         # EBI OLS annotation headers that can contain synonyms
         self.relevant_keys = ["has_related_synonym", "alternative term", "comment", "description",
                               "symbol from nomenclature authority", "hasExactSynonym"]
 
-        # create a list of all the greek characters that are handled in the alternative characters module
-        greek_char_names = list(chars.greek_dict.keys())
-        [greek_char_names.extend(each) for each in list(chars.greek_dict.values())]
-        self.greek_char_list = greek_char_names
-
     def extract_syns(self, term):
         """
         extract synonyms from relevant headers
 
         :param dict term: the 'term' part of a full page's parsed JSON
-        :return: append synonyms to the synonym list attribute
+        :return: add synonyms to the synonym set attribute
         :rtype: None
         """
         self.logger.info(f"{threading.current_thread().name}: extracting synonyms from element")
+        term_syns = []
 
         # if exists and not null, capture synonyms and add them to the synonym list
         if "synonyms" in term and term["synonyms"]:  # if exists and not null
             for syn in term["synonyms"]:
-                self.syns.append(syn)
+                term_syns.append(syn)
 
         # if exists and not null, capture label and add to the synonym list
         if "label" in term and term["label"]:  # if exists and not null
-            self.syns.append(term["label"])
+            term_syns.append(term["label"])
 
         # if the term has annotations and there are any relevant headers within the annotations, then capture
         # synonyms from the relevant header(s) and add them to the synonym list
@@ -178,12 +348,14 @@ class ExtractOLSSynonyms:
                             syn = syn.replace("Other designations:", "")
                             other_designations = syn.split("|")
                             for o_des in other_designations:
-                                self.syns.append(o_des.strip())
+                                term_syns.append(o_des.strip())
                         else:
-                            self.syns.append(syn)
+                            term_syns.append(syn)
 
-        # de-duplicate as we go to prevent the list getting too long if terms have many syns/many ontology nodes
-        self.syns = list(set(self.syns))
+        # add the term's synonyms to the synonym set, all at once, de-duplicating as we go to prevent the synonyms
+        # getting too many if terms have many syns/many ontology nodes
+        with self.syns_lock:
+            self.syns.update(term_syns)
 
     def get_elems_and_log(self, parsed_json):
         """
@@ -214,9 +386,6 @@ class ExtractOLSSynonyms:
         :param dict parsed_json: a parsed JSON object for an EBI OLS page
         :return:
         """
-        # short sleep to prevent sending too many requests
-        sleep(0.05)
-
         # extract URL string for next page
         next_page_url = parsed_json["_links"]["next"]["href"]
 
@@ -231,13 +400,51 @@ class ExtractOLSSynonyms:
         # get synonyms from the parsed next page
         self.get_syns_from_json(parsed_next_page)
 
-    def get_syns_from_json(self, parsed_json, descendants=False):
+    @staticmethod
+    def get_remaining_page_urls(parsed_json):
+        """
+        create the urls of all of the pages after the current page of a set of results, from the url of the next page
+
+        :param dict parsed_json: a parsed JSON object for an EBI OLS page with a 'next' page
+        :return: urls of the remaining pages, or an empty list if they cannot be determined
+        :rtype: list
+        """
+        next_page_url = parsed_json["_links"]["next"]["href"]
+        page = parsed_json.get("page", {})
+        if "number" not in page or "totalPages" not in page or not page_number_regex.search(next_page_url):
+            return []
+
+        # replace the page number in the url of the next page with the number of each remaining page
+        return [page_number_regex.sub(fr"\g<1>{page_number}", next_page_url)
+                for page_number in range(int(page["number"]) + 1, int(page["totalPages"]))]
+
+    def get_syns_from_pages(self, urls, description, descendants=False, follow_next=True):
+        """
+        get the pages at the urls at the same time in the shared pool of OLS threads, and get synonyms from each page as
+        soon as it (and the pages before it) have been received
+
+        :param list urls: urls of EBI OLS pages
+        :param str description: description of the expected URL contents
+        :param bool descendants: whether getting descendants
+        :param bool follow_next: whether to also get the synonyms from the pages after each page
+        :return: add synonyms to the synonym list attribute
+        :rtype: None
+        """
+        # initialise request object with term and logger
+        request = OLSRequests(original_term=self.original_term, logger=self.logger)
+
+        for parsed_page in request.run_in_pool(request.get_json_for_full_url, urls, description):
+            self.get_syns_from_json(parsed_page, descendants, follow_next)
+
+    def get_syns_from_json(self, parsed_json, descendants=False, follow_next=True):
         """
         access relevant values within the dict of the parsed JSON, extract synonyms from the page, and move on to the
-        next page to do the same if one exists
+        next pages to do the same if they exist
 
         :param dict parsed_json: a parsed JSON object for an EBI OLS page
         :param bool descendants: whether getting descendants
+        :param bool follow_next: whether to also get the synonyms from the pages after this page (False if they are
+                                 already being collected)
         :return: add synonyms to the synonym list attribute
         :rtype: None
         """
@@ -270,9 +477,15 @@ class ExtractOLSSynonyms:
                                     f"searching for '{self.original_term}'. No synonyms obtained from the following: "
                                     f"{parsed_json}")
 
-        # if the results page is part of a set and there is a 'next' page, then also get the synonyms from the next page
-        if "_links" in parsed_json and "next" in parsed_json["_links"]:
-            self.get_syns_from_next_page(parsed_json)
+        # if the results page is part of a set and there is a 'next' page, then also get the synonyms from the remaining
+        # pages, all at once if their urls can be determined or else one page after another
+        if follow_next and "_links" in parsed_json and "next" in parsed_json["_links"]:
+            page_urls = self.get_remaining_page_urls(parsed_json)
+            if page_urls:
+                self.get_syns_from_pages(page_urls, f"{self.original_term} [next page]", descendants,
+                                         follow_next=False)
+            else:
+                self.get_syns_from_next_page(parsed_json)
 
     def get_syns_of_descendants(self, parsed_json):
         """
@@ -281,8 +494,6 @@ class ExtractOLSSynonyms:
         :param dict parsed_json: request response's text information parsed in to a dict
         :return: append synonyms to the synonym list
         """
-        # initialise OLS request object
-        descendant_request = OLSRequests(original_term=self.original_term, logger=self.logger)
         ids = []
         description = f"descendants of '{self.original_term}'"
         self.logger.info(f"{threading.current_thread().name}: Collecting synonyms for {description}")
@@ -296,17 +507,13 @@ class ExtractOLSSynonyms:
                                 f"'{parsed_json}'")
         # get unique IDs
         ids = set(ids)
-        # for each id, get synonyms of its hierarchical descendants
-        for obo_id in ids:
-            # get parsed JSON of descendants
-            parsed_descendants = descendant_request.get_json_for_full_url(
-                f'http://www.ebi.ac.uk/ols/api/ontologies/uberon/hierarchicalDescendants?id={obo_id}&size=1000',
-                description
-            )
-            # get synonyms from parsed JSON of descendants
-            self.get_syns_from_json(parsed_descendants, descendants=True)
+        # for each id, get the parsed JSON of its hierarchical descendants (all at once) and get synonyms from it
+        urls = [f'http://www.ebi.ac.uk/ols/api/ontologies/uberon/hierarchicalDescendants?id={obo_id}&size=1000'
+                for obo_id in ids]
+        self.get_syns_from_pages(urls, description, descendants=True)
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def word_search(word):
         """
         determine whether a word/phrase is a boundaried substring of another phrase
@@ -314,10 +521,26 @@ class ExtractOLSSynonyms:
         :param str word: a word or phrase that is a synonym of the original term, and is not known to be redundant
         :return: compiled regex with escaped special characters and boundaries placed around the word/phrase
         """
+        # the compiled search for each word is cached, because each synonym is searched for in every other synonym
         # escape special characters
         word = re.escape(word)
         return re.compile(fr'\b({word})\b', flags=re.IGNORECASE).search
 
+    @staticmethod
+    def fold_case(text):
+        """
+        case fold a word/phrase, so that a case-insensitive word search can only find a word in a phrase if the folded
+        word is a substring of the folded phrase: this fast substring check can then be used to skip most searches
+
+        :param str text: a word or phrase
+        :return: case-folded text
+        :rtype: str
+        """
+        # ascii text is folded by lower-casing it, which is faster
+        if text.isascii():
+            return text.lower()
+        return text.translate(dotted_i_table).casefold()
+
     def remove_noise_and_punctuation(self, syn_list, syn_type):
         """
         initial cleaning of the synonym list
@@ -330,49 +553,45 @@ class ExtractOLSSynonyms:
         # initialise clean list, de-duplicate
         filtered_terms = []
         unique = set(syn_list)
+        # look up the original term search, minimum length and type check once rather than for every term
+        original_term_search = self.word_search(self.original_term)
+        folded_original_term = self.fold_case(self.original_term)
+        min_syn_len = self.min_syn_len
+        is_tissue = syn_type == "tissue"
 
         # clean each term
         for term in unique:
-            # ignore terms that contain the original term within them
-            if self.word_search(self.original_term)(term):
+            upper_term = term.upper()
+            # ignore terms that contain the original term within them (only searching terms that contain its letters)
+            if folded_original_term in self.fold_case(term) and original_term_search(term):
                 pass
             # ignore terms that contain noise indicators, e.g. "Editor note"
             elif not term.startswith("GO:") and \
-                    any(noisy_term.upper() in term.upper() for noisy_term in noise.synonym_noise_indicators):
+                    any(noisy_term in upper_term for noisy_term in upper_noise_indicators):
                 pass
             # ignore terms that contain . unless there are numbers in the term
-            elif "." in term and not re.search(r"\d+", term):
+            elif "." in term and not numbers_regex.search(term):
                 pass
             else:
                 # replace terms and punctuation with spaces (some syns use punctuation instead of spaces)
-                term = term.replace("EXACT", " ")  # remove "EXACT" (commonly added to the end of synonyms)
-                term = term.replace("susceptibility to", " ")  # remove this common phrase
-                term = term.replace("working designation", " ")  # remove this common phrase
-                term = term.replace("_", " ")  # replace underscores with spaces
-                term = term.replace(",", " ")  # EPMC handles commas/no commas
-                term = term.replace("?", " ")  # common in some ontologies, possibly in place of hyphen characters
-                term = term.replace("\"", " ")  # remove quote marks
-                # remove fake quote marks
-                term = term.replace("“", " ")
-                term = term.replace("”", " ")
-                for char in chars.hyphens:
-                    term = term.replace(char, " ")  # EPMC treats spaces/hyphens/dashes the same, so normalise to spaces
+                term = noise_phrases_regex.sub(" ", term)  # remove "EXACT" and common phrases
+                # replace underscores, commas, question marks (common in some ontologies, possibly in place of hyphen
+                # characters), quote marks, fake quote marks and hyphens with spaces
+                term = term.translate(punctuation_table)
                 # remove brackets and their contents, unless the contents are digits or numerals
-                if not re.findall(fr"\(.*[{''.join(chars.numerals)}\d]+.*\)", term):
-                    term = re.sub(r"[\(\[]+.*?[\)\]]+", "", term)
-                # EPMC handles brackets/no brackets, so remove to reduce character count
-                term = term.replace("(", " ")
-                term = term.replace(")", " ")
-                term = re.sub(r"\n", " ", term)  # remove any newline characters
-                term = re.sub(r"\s{2,}", " ", term)  # de-duplicate spaces
+                if not bracket_number_regex.search(term):
+                    term = bracket_content_regex.sub("", term)
+                # EPMC handles brackets/no brackets, so remove to reduce character count, and remove newline characters
+                term = term.translate(bracket_table)
+                term = multiple_spaces_regex.sub(" ", term)  # de-duplicate spaces
                 term = term.strip()  # strip trailing spaces
 
                 # keep cleaned terms that are at least the minimum syn length
-                if len(term) >= self.min_syn_len:
+                if len(term) >= min_syn_len:
                     # for tissues, remove syns that are a single letter followed by digits
                     # (e.g. A10 is very noisy, but only remove these syns from tissues because e.g. p53 is a valid gene)
-                    if syn_type == "tissue":
-                        if not re.match(r"[A-Z]\d+$", term):
+                    if is_tissue:
+                        if not letter_number_regex.match(term):
                             filtered_terms.append(term)
                     else:
                         filtered_terms.append(term)
@@ -390,104 +609,109 @@ class ExtractOLSSynonyms:
         :param list syns: list of synonyms with noise filtered out
         :return: list of non-redundant synonyms
         """
-        redundant = []
+        # count the number of times each synonym is found to be redundant
+        redundant = Counter()
 
         # sort synonym list on ascending number of words in synonym
         sorted_on_phrase_length = [syn.split() for syn in syns]
         sorted_on_phrase_length.sort(key=len)
         sorted_on_phrase_length = [" ".join(syn) for syn in sorted_on_phrase_length]
 
+        # case fold the synonyms and join them with newlines (which have been removed from synonyms, and are not in the
+        # phrases), so that each phrase can be found in all of the synonyms with fast substring searches, and the
+        # boundaried regex search is only run on the synonyms that contain the phrase
+        folded_syns = [self.fold_case(syn) for syn in syns]
+        folded_text = "\n".join(folded_syns)
+        # the position of the start of each synonym in the joined text (and the position after the end of the text)
+        syn_starts = list(itertools.accumulate((len(syn) + 1 for syn in folded_syns), initial=0))
+
         # determine redundant synonyms:
         # starting from the phrase with the smallest number of words, if the phrase is not known to be redundant,
         # then check whether the phrase is a substring of any of the other phrases
         for term in sorted_on_phrase_length:
             if term not in redundant:
-                for syn in syns:
-                    if syn == term:
-                        pass  # ignore self
-                    # if the term is a substring of the syn, add the syn to the list of redundant phrases
-                    elif self.word_search(term)(syn):
-                        redundant.append(syn)
-
-        # remove redundant synonyms from the list of synonyms
-        for redundant_syn in redundant:
-            if redundant_syn in syns:
-                syns.remove(redundant_syn)
-        return syns
+                term_search = self.word_search(term)
+                folded_term = self.fold_case(term)
+                position = folded_text.find(folded_term)
+                while position != -1:
+                    # get the synonym that the phrase was found in
+                    syn_index = bisect.bisect_right(syn_starts, position) - 1
+                    syn = syns[syn_index]
+                    # if the term is a substring of the syn (other than itself), add the syn to the redundant phrases
+                    if syn != term and term_search(syn):
+                        redundant[syn] += 1
+                    # look for the phrase in the synonyms after this one
+                    position = folded_text.find(folded_term, syn_starts[syn_index + 1])
+
+        # remove redundant synonyms from the list of synonyms (each time that they were found to be redundant)
+        non_redundant = []
+        for syn in syns:
+            if redundant[syn]:
+                redundant[syn] -= 1
+            else:
+                non_redundant.append(syn)
+        return non_redundant
 
     @staticmethod
-    def add_space_before_number(syns):
+    def add_space_before_number(syn):
         """
         EPMC treats spaces/hyphens/dashes the same, but does not treat spaces & no spaces the same:
         ADAMTS-5 == ADAMTS 5, but ADAMTS 5 =/= ADAMTS5
-        So, for any instances of synonyms without spaces preceding numbers (except C11orf22 type synonyms), also add
-        a version with a space (e.g. for "ADAMTS5", also add "ADAMTS 5" to the list)
+        So, for a synonym without spaces preceding numbers (except C11orf22 type synonyms), create versions with a
+        space (e.g. for "ADAMTS5", create "ADAMTS 5")
 
-        :param list syns: list of synonyms
-        :return: list of synonyms
+        :param str syn: a synonym
+        :return: list of spacing variants of the synonym
+        :rtype: list
         """
         diff_spacing = []
-        
-        # get numbers (and optionally capital letters) that are not preceded by hyphens, numbers or spaces
-        number_in_gene = re.compile(fr".*[^\s\d]+\d+\s*[A-z]?[\s\d]*\b")
 
-        for syn in syns:
-            # replace any hyphens with spaces for easier handling
-            # (in other cleaning steps, hyphens are removed from synonyms but not from original terms)
-            for hyp in chars.hyphens:
-                syn = re.sub(hyp, " ", syn)
-            # for synonyms except those in formats such as orf, KIAA, UNQ codes, p53/A4, or full phrases
-            if not re.match(r"[Cc]\d+orf\d+", syn) and not re.match(r"UNQ\d+/PRO\d+", syn) and not \
-                    re.match(r"KIAA\d+", syn) and not re.fullmatch(r"[A-z]\d{1,3}", syn) \
-                    and not re.fullmatch(r"(CI|RR|AIM|FBS|IOP)\d+", syn) and not len(syn.split(" ")) > 2:
-                for syn_match in re.finditer(number_in_gene, syn):
-                    res = syn_match.group()
-                    n = 0
-                    for num_match in re.finditer(r"\d+", res):
-                        n += 1
-                        match = num_match.group()
-                        space_variant = (re.sub(match, " " + match, syn, n))
-                        diff_spacing.append(space_variant)
-                        position = n
-                        while re.search(number_in_gene, space_variant):
-                            # create other spacing variants for the term (e.g. if the term contains >1 number)
-                            position += 1
-                            space_variant = (re.sub(r"(\d+)", r" \1", space_variant, position))
-                            diff_spacing.append(re.sub(r"\s+", " ", space_variant))
-
-        # add the spacing variant synonyms to the synonym list, de-duplicate and return
-        syns.extend(diff_spacing)
-        return list(set(syns))
+        # replace any hyphens with spaces for easier handling
+        # (in other cleaning steps, hyphens are removed from synonyms but not from original terms)
+        syn = syn.translate(chars.hyphen_table)
+        # for synonyms except those in formats such as orf, KIAA, UNQ codes, p53/A4, or full phrases
+        if not orf_regex.match(syn) and not unq_regex.match(syn) and not kiaa_regex.match(syn) and not \
+                short_letter_number_regex.fullmatch(syn) and not abbreviation_number_regex.fullmatch(syn) \
+                and not len(syn.split(" ")) > 2:
+            for syn_match in number_in_gene_regex.finditer(syn):
+                res = syn_match.group()
+                n = 0
+                for num_match in numbers_regex.finditer(res):
+                    n += 1
+                    match = num_match.group()
+                    space_variant = (re.sub(match, " " + match, syn, n))
+                    diff_spacing.append(space_variant)
+                    position = n
+                    while number_in_gene_regex.search(space_variant):
+                        # create other spacing variants for the term (e.g. if the term contains >1 number)
+                        position += 1
+                        space_variant = numbers_regex.sub(r" \g<0>", space_variant, position)
+                        diff_spacing.append(whitespace_regex.sub(" ", space_variant))
+        return diff_spacing
 
     @staticmethod
-    def remove_space_hyphen_before_number(syns):
+    def remove_space_hyphen_before_number(syn):
         """
         EPMC treats spaces/hyphens/dashes the same, but does not treat spaces & no spaces the same:
         ADAMTS-5 == ADAMTS 5, but ADAMTS 5 =/= ADAMTS5
-        so, for any instances of a number preceded by a space/hyphen/dash, also add a version without the space/hyphen/
-        dash to the list - e.g. for "ADAMTS-5" also add "ADAMTS5" to the list
+        so, for any instances of a number preceded by a space/hyphen/dash in a synonym, create a version without the
+        space/hyphen/dash - e.g. for "ADAMTS-5" create "ADAMTS5"
 
-        :param list syns: list of synonyms
-        :return: list of synonyms
+        :param str syn: a synonym
+        :return: list of spacing variants of the synonym
+        :rtype: list
         """
         diff_spacing = []
-        # regex for one or more numbers, plus optional capital letters, preceded by a space
-        number_in_gene = re.compile(fr"\s+\d+\s*[A-z]?[\s\d]*\b")
 
-        for syn in syns:
-            n = 0
-            # replace any hyphens with spaces for easier handling
-            # (in other cleaning steps, hyphens are removed from synonyms but not from original terms)
-            for hyp in chars.hyphens:
-                syn = re.sub(hyp, " ", syn)
-            for match in re.finditer(number_in_gene, syn):
-                n += 1
-                res = match.group(0)
-                diff_spacing.append(re.sub(res, res.lstrip(), syn, n))
-
-        # add the spacing variants to the list of synonyms, de-duplicate and return
-        syns.extend(diff_spacing)
-        return list(set(syns))
+        n = 0
+        # replace any hyphens with spaces for easier handling
+        # (in other cleaning steps, hyphens are removed from synonyms but not from original terms)
+        syn = syn.translate(chars.hyphen_table)
+        for match in spaced_number_in_gene_regex.finditer(syn):
+            n += 1
+            res = match.group(0)
+            diff_spacing.append(re.sub(res, res.lstrip(), syn, n))
+        return diff_spacing
 
     @staticmethod
     def remove_multiple_spaces(syns):
@@ -499,9 +723,28 @@ class ExtractOLSSynonyms:
         """
         cleaned_syns = []
         for syn in syns:
-            cleaned_syns.append(re.sub(r"\s{2,}", " ", syn))  # replace all instances of 2 or more spaces with 1 space
+            cleaned_syns.append(multiple_spaces_regex.sub(" ", syn))  # replace all instances of 2 or more spaces with 1 space
         return cleaned_syns
 
+    @staticmethod
+    def create_spacing_variants(syns):
+        """
+        in a single pass over the synonyms, add versions of each synonym with spaces added before its numbers, add
+        versions of the synonym and of its spaced versions with the spaces/hyphens/dashes before numbers removed, and
+        remove multiple spaces from all of the versions
+
+        :param list syns: list of synonyms
+        :return: de-duplicated list of synonyms and their spacing variants
+        :rtype: list
+        """
+        spacing_variants = set()
+        for syn in syns:
+            for space_variant in [syn, *ExtractOLSSynonyms.add_space_before_number(syn)]:
+                for variant in [space_variant, *ExtractOLSSynonyms.remove_space_hyphen_before_number(space_variant)]:
+                    # replace all instances of 2 or more spaces with 1 space
+                    spacing_variants.add(multiple_spaces_regex.sub(" ", variant))
+        return list(spacing_variants)
+
     def greek_char_and_spacing_expansion(self, syns):
         """
         for more complete literature search, account for variations in e.g. hyphenation, numerals in synonyms
@@ -514,10 +757,7 @@ class ExtractOLSSynonyms:
 
         # add and remove spaces: in EPMC searching, 'ABC-1' and 'ABC 1' are equivalent, but 'ABC1' and 'ABC 1' are not
         self.logger.debug("Creating spacing variants between letters and numbers in synonyms")
-        syns = self.add_space_before_number(syns)
-        syns = self.remove_space_hyphen_before_number(syns)
-        syns = self.remove_multiple_spaces(syns)
-        return syns
+        return self.create_spacing_variants(syns)
 
     def create_type_variations(self, type_phrase, syn):
         """
@@ -551,18 +791,15 @@ class ExtractOLSSynonyms:
         additional_syns = []
 
         for syn in syns:
-            if "type" in syn.lower():  # if the synonym contains 'type'
-                # create compiled regexes for finding phrases containing types
-                x_hyphen_type = re.compile(fr"(.+\s*[{''.join(chars.hyphens)}]\s*[Tt][Yy][Pp][Ee])")
-                type_x = re.compile(fr"^.*([Tt][Yy][Pp][Ee][\s\d{''.join(chars.numerals)}]*\b[a-zA-Z]?\b[\s\d"
-                                    fr"{''.join(chars.numerals)}]*({'|'.join(self.greek_char_list)})*[\s\d]*)")
+            lower_syn = syn.lower()
+            if "type" in lower_syn:  # if the synonym contains 'type'
 
-                hyphen_result = re.search(x_hyphen_type, syn.lower())
+                hyphen_result = x_hyphen_type_regex.search(lower_syn)
                 if hyphen_result:  # unlikely; most hyphens have been removed by this stage of processing
                     # create variations of the synonym and add them to additional_syns
                     additional_syns.extend(self.create_type_variations(hyphen_result.group(1), syn))
 
-                type_x_result = re.search(type_x, syn)
+                type_x_result = type_x_regex.search(syn)
                 # if type is followed by expected characters such as numbers, numerals, greek characters, get variations
                 if type_x_result and type_x_result.group(1).strip().lower() != "type":
                     # create variations of the synonym and add them to additional_syns
@@ -587,9 +824,9 @@ class ExtractOLSSynonyms:
         for syn in syns:
             syn = syn.strip()
             if syn.endswith("chain"):
-                syn = re.sub("chain", "", syn, flags=re.IGNORECASE).strip()
+                syn = chain_regex.sub("", syn).strip()
             elif syn.endswith("chains"):
-                syn = re.sub("chains", "", syn, flags=re.IGNORECASE).strip()
+                syn = chains_regex.sub("", syn).strip()
             new_syns.append(syn)
 
         # return de-duplicated synonyms with chain/chains removed
@@ -607,21 +844,26 @@ class ExtractOLSSynonyms:
         sub_terms = []
         syns_to_remove = []
         for syn in syns:
+            # find the names of the greek letters in the syn at once, and only check for the names that are in it
+            names_in_syn = {name_match.lastgroup for name_match in greek_names_regex.finditer(syn)}
+            upper_syn = syn.upper()
             # keys are words such as 'alpha', value_lists are characters such as ["α", "∝", "𝛂", "𝛼"]
             for key, value_list in chars.greek_dict.items():
-                if re.match(fr"{key}\s?\d+", syn, re.IGNORECASE):  # prevent adding noisy syns like 'gamma 2'
-                    syns_to_remove.append(syn)
-                else:
-                    if (re.match(fr".*\b{key}\b.*", syn, re.IGNORECASE) or
-                            re.match(fr".*[^a-zA-Z]{key}[^a-zA-Z].*", syn, re.IGNORECASE)):
+                if key in names_in_syn:
+                    name_number_regex, name_regex, separate_name_regex = greek_name_regexes[key]
+                    if name_number_regex.match(syn):  # prevent adding noisy syns like 'gamma 2'
+                        syns_to_remove.append(syn)
+                    elif separate_name_regex.match(syn):
                         for character in value_list:
-                            sub_terms.append(re.sub(key, character, syn, flags=re.IGNORECASE))
+                            sub_terms.append(name_regex.sub(character, syn))
                 for char in value_list:
-                    if not (re.match(fr"{char}\s?\d+", syn, re.IGNORECASE)):  # prevent adding noisy syns like 'gamma 2'
-                        if char.upper() in syn.upper():
-                            for other_char in value_list:
-                                sub_terms.append(syn.replace(char, other_char))
-                            sub_terms.append(syn.replace(char, key))
+                    upper_char, char_number_regex = greek_char_number_regexes[char]
+                    # prevent adding noisy syns like 'gamma 2'
+                    if upper_char in upper_syn and not char_number_regex.match(syn):
+                        for other_char in value_list:
+                            sub_terms.append(syn.replace(char, other_char))
+                        sub_terms.append(syn.replace(char, key))
+        syns_to_remove = set(syns_to_remove)
         cleaner_syns = [i for i in syns if i not in syns_to_remove]
         cleaner_syns.extend(sub_terms)
 
@@ -649,8 +891,9 @@ class ExtractOLSSynonyms:
         # if any of the synonyms in the list are present as keys in the anatomy qualifiers dictionary, then add the
         # relevant anatomy qualifiers values to the synonym list
         for syn in syns:
-            if syn.lower() in anatomy_qualifiers.keys():
-                new_syns.extend(anatomy_qualifiers[syn.lower()])
+            qualifiers = anatomy_qualifiers.get(syn.lower())
+            if qualifiers is not None:
+                new_syns.extend(qualifiers)
 
         self.logger.info("Done adding anatomy qualifiers to synonyms")
 
@@ -671,7 +914,7 @@ class ExtractOLSSynonyms:
         if syns_list:
             syns = syns_list
         else:
-            syns = self.syns
+            syns = list(self.syns)
 
         # remove non-required punctuation and syns that contain the original term
         # (log here so prevent logging multiple times; this function is also called before adding anatomy qualifiers)
@@ -698,7 +941,7 @@ class ExtractOLSSynonyms:
         if syns_list:
             return syns
         else:
-            self.syns = syns
+            self.syns = set(syns)
 
     def get_syns(self, parsed_json, descendants=False):
         """
@@ -712,11 +955,32 @@ class ExtractOLSSynonyms:
         self.get_syns_from_json(parsed_json)
         if descendants:
             self.get_syns_of_descendants(parsed_json)
-        return self.syns
+        # return a copy of the synonyms as a list, which other threads cannot add to meanwhile
+        with self.syns_lock:
+            return list(self.syns)
+
+    def get_syns_for_iri(self, iri, req, descendants=False):
+        """
+        get the EBI OLS page for the iri and get synonyms from it, so that each iri is fetched and parsed in one step
+
+        :param str iri: IRI for a relevant ontology node
+        :param OLSRequests req: request object initialised with the original term and logger
+        :param bool descendants: whether to get the descendants of the node
+        :return: non-redundant synonyms
+        :rtype: list
+        """
+        parsed_json = req.get_json_for_iri(iri)
+        return self.get_syns(parsed_json, descendants)
 
 
 class GetUniprotSynonyms:
     """Get gene synonyms from uniprot"""
+
+    # responses for each query url, shared by all instances so that a gene searched more than once (e.g. with
+    # different keywords) is only requested once
+    response_cache = {}
+    cache_lock = threading.Lock()
+
     def __init__(self, row, logger):
         """
         init
@@ -741,6 +1005,12 @@ class GetUniprotSynonyms:
         run the query and either retrieve the gene synonyms page contents or return an appropriate error
         :return: result or error
         """
+        # return the cached response if the query has already been run
+        with self.cache_lock:
+            if query in self.response_cache:
+                self.logger.info(f"{threading.current_thread().name}: Using cached response for {query}")
+                return self.response_cache[query]
+
         # run the query and either retrieve the gene synonyms or return an appropriate error
         try:
             res = requests.get(query)
@@ -748,6 +1018,8 @@ class GetUniprotSynonyms:
             # log status code of response
             self.logger.info(f"{threading.current_thread().name}: {res} for {query}")
             res.close()
+            with self.cache_lock:
+                self.response_cache[query] = res
             return res
 
         except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError,
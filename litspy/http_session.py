@@ -0,0 +1,136 @@
+import requests
+import sqlite3
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HttpSession:
+    """
+    class for creating requests sessions, which keep connections open to be reused by later requests to the same host
+    """
+    @staticmethod
+    def create_session(pool_size=64, retries=3):
+        """
+        create a session with a connection pool large enough to be shared by all threads, which retries failed
+        connections and server errors (with increasing waits between attempts) before giving up
+
+        :param int pool_size: maximum number of connections to keep open to each host
+        :param int retries: number of times to retry a request
+        :return: session to make requests with
+        :rtype: requests.Session
+        """
+        # after the last retry, return the error response rather than raising a RetryError, so that callers can still
+        # raise a HTTPError with raise_for_status
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+
+class RateLimiter:
+    """
+    class for limiting the rate of requests sent by all threads together: requests can be sent in bursts of up to the
+    burst size, and then at the given rate, without making threads wait for each other's requests to finish
+    """
+    def __init__(self, rate, burst):
+        """
+        initialise with a full bucket of tokens, one of which is taken for each request
+
+        :param float rate: number of requests per second to allow after a burst
+        :param int burst: maximum number of requests to allow at once
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        wait until a request can be sent without going over the rate limit
+
+        :return: None
+        """
+        with self.lock:
+            # refill the bucket for the time since the last request, and take a token for this request. if the bucket
+            # was empty, then the token is reserved ahead of time, so other threads wait for the tokens after it
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate) - 1
+            self.last_time = now
+            wait_time = -self.tokens / self.rate
+
+        # wait for the token outside of the lock, so that other threads can reserve their tokens meanwhile
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class ResponseCache:
+    """
+    class for caching the contents of responses on disk, in a sqlite database keyed on their urls, so that responses
+    are reused by later runs until they expire rather than requested again
+    """
+    def __init__(self, path, max_age):
+        """
+        initialise without opening the database, which is only created when it is first used
+
+        :param str path: path to the database file
+        :param float max_age: number of seconds after which cached responses expire
+        """
+        self.path = path
+        self.max_age = max_age
+        self.enabled = True
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """
+        open the database (and create its table if it does not exist yet), unless it is already open. The connection
+        is shared by all threads, so it must only be used under the lock
+
+        :return: connection to the database
+        :rtype: sqlite3.Connection
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, time REAL, "
+                                    "content BLOB)")
+        return self.connection
+
+    def get(self, url):
+        """
+        get the cached content of the response for a url
+
+        :param str url: url of the response
+        :return: content of the response, or None if the cache is turned off, or the response is not cached or expired
+        :rtype: bytes or None
+        :raises sqlite3.Error: if the database cannot be read
+        """
+        if not self.enabled:
+            return None
+        with self.lock:
+            row = self.connect().execute("SELECT content FROM responses WHERE url = ? AND time > ?",
+                                         (url, time.time() - self.max_age)).fetchone()
+        return row[0] if row else None
+
+    def set(self, url, content):
+        """
+        cache the content of the response for a url, replacing any expired content
+
+        :param str url: url of the response
+        :param bytes content: content of the response
+        :return: None
+        :raises sqlite3.Error: if the database cannot be written to
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            # commit each response as it is added, so that it is kept even if the run is stopped
+            with self.connect() as connection:
+                connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (url, time.time(), content))
@@ -32,6 +32,7 @@ class Arguments:
         self.top_ten = False
         self.quiet_results = False
         self.min_syn_len = None
+        self.no_cache = False
 
     @staticmethod
     def determine_required(arg_flag):
@@ -107,6 +108,7 @@ class Arguments:
                   "\nand any valid Europe PMC search parameters, preceded by -- (e.g. --PUB_YEAR 2000). For a list of "
                   "available parameters and their search syntax, visit https://europepmc.org/Help#SSR"
                   "\n[-z] minimum length of synonyms (optional. default is 2 characters)"
+                  "\n[-n] turn off the cache of EBI OLS responses from previous runs (optional)"
         )
         parser.add_argument(
             '-i', '--infile', dest='infile',
@@ -189,6 +191,11 @@ class Arguments:
                  "this option to specify a longer minimum synonym length for your search if a two-character synonym has"
                  " negatively affected the results of a previous search."
         )
+        parser.add_argument(
+            '-n', '--no-cache', dest='no_cache', default=False, action='store_true',
+            help="Specify the -n flag to request all synonyms from the EBI OLS again, rather than using the responses "
+                 "cached by runs in the last week (responses from this run will not be cached either)"
+        )
         return parser
 
     @staticmethod
@@ -343,7 +350,8 @@ class Arguments:
         for k, v in arg_dict.items():
             if v is not None:
                 if k not in ["infile", "outfile", "genes", "type", "taxid", "charts", "top_ten", "n_threads", "log",
-                             "disease", "tissue", "kwd", 'log_file', 'quiet_results', 'expand', "min_syn_len"]:
+                             "disease", "tissue", "kwd", 'log_file', 'quiet_results', 'expand',
+                             "min_syn_len", "no_cache"]:
                     other_args[k] = v
         return other_args
 
@@ -380,6 +388,7 @@ class Arguments:
         self.expand = arg_dict['expand']
         self.n_threads = arg_dict['n_threads']
         self.min_syn_len = arg_dict['min_syn_len']
+        self.no_cache = arg_dict['no_cache']
 
         if 'Linux' in uname().system and 'Microsoft' in uname().release:
             self.quiet_results = True
@@ -20,13 +20,14 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     install_requires=[
         'beautifulsoup4',
         'requests',
         'lxml',
         'wordcloud',
         'pandas',
+        'numpy',
         'matplotlib',
         'xlrd',
         'openpyxl',